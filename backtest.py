@@ -0,0 +1,180 @@
+# backtest.py
+
+import sqlite3
+import argparse
+
+import numpy as np
+import pandas as pd
+
+TOP_K = 10
+BREAKOUT_PCT = 50.0        # a breakout gains at least this % of its stars ...
+BREAKOUT_WINDOW = 30       # ... within this many days
+BREAKOUT_MIN_STARS = 500
+
+def load_history(db_path):
+    """
+    Loads repo_stats once into a day x repo star matrix.
+    Returns (days, repo_names, stars): stars[d, r] is repo r's last star count on or before
+    days[d], NaN before the repo was first seen.
+    """
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query("SELECT repo_full_name, star_count, timestamp FROM repo_stats", conn)
+    conn.close()
+    return history_matrix(df["repo_full_name"], df["star_count"], df["timestamp"])
+
+def history_matrix(repo_names, star_counts, timestamps):
+    timestamps = pd.to_datetime(pd.Series(timestamps), errors="coerce")
+    valid = timestamps.notna().to_numpy()
+    timestamps = timestamps[valid]
+    order = np.argsort(timestamps.to_numpy(), kind="stable")
+
+    repo_idx, repos = pd.factorize(pd.Series(repo_names)[valid].to_numpy()[order])
+    day_values = timestamps.to_numpy()[order].astype("datetime64[D]")
+    first_day = day_values.min() if len(day_values) else np.datetime64("today", "D")
+    day_idx = (day_values - first_day).astype(np.int64)
+    n_days = int(day_idx.max()) + 1 if len(day_idx) else 0
+
+    stars = np.full((n_days, len(repos)), np.nan)
+    # Rows are sorted by time, so for repeated (day, repo) pairs the last write wins
+    stars[day_idx, repo_idx] = np.asarray(star_counts, dtype=np.float64)[valid][order]
+    days = first_day + np.arange(n_days).astype("timedelta64[D]")
+    return days, np.asarray(repos), forward_fill(stars)
+
+def forward_fill(matrix):
+    """
+    Fills NaNs down each column with the last value seen above them.
+    """
+    if not matrix.size:
+        return matrix
+    rows = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[0])[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return matrix[rows, np.arange(matrix.shape[1])]
+
+def lagged(stars, lag):
+    """
+    stars shifted down by `lag` days (NaN for the first `lag` rows).
+    """
+    out = np.full_like(stars, np.nan)
+    if lag < stars.shape[0]:
+        out[lag:] = stars[:-lag] if lag else stars
+    return out
+
+def growth_diff(lag):
+    def score(stars):
+        return stars - lagged(stars, lag)
+    return score
+
+def growth_pct(lag):
+    def score(stars):
+        old = lagged(stars, lag)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(old > 0, (stars - old) / old * 100, np.nan)
+    return score
+
+# Each ranking maps the day x repo star matrix to a day x repo score matrix (higher ranks first).
+# Add your own: any function of the star matrix works.
+RANKINGS = {
+    "daily_pct": growth_pct(1),
+    "weekly_pct": growth_pct(7),
+    "daily_diff": growth_diff(1),
+    "weekly_diff": growth_diff(7),
+}
+
+def top_k_members(scores, k=TOP_K):
+    """
+    Boolean day x repo matrix: True where the repo is in that day's top k.
+    Repos with no score (NaN) never make the board.
+    """
+    n_days, n_repos = scores.shape
+    members = np.zeros_like(scores, dtype=bool)
+    if not n_repos:
+        return members
+    k = min(k, n_repos)
+    filled = np.where(np.isnan(scores), -np.inf, scores)
+    top = np.argpartition(-filled, k - 1, axis=1)[:, :k]
+    members[np.arange(n_days)[:, None], top] = True
+    members &= np.isfinite(filled)
+    return members
+
+def leaderboard(scores, repo_names, day, k=TOP_K):
+    """
+    The ranked top k (repo, score) for one day index, for inspecting a single date.
+    """
+    row = np.where(np.isnan(scores[day]), -np.inf, scores[day])
+    best = np.argsort(-row, kind="stable")[:k]
+    return [(repo_names[i], row[i]) for i in best if np.isfinite(row[i])]
+
+def rank_stability(members):
+    """
+    Mean Jaccard similarity of consecutive days' top-k sets, skipping days with an empty board.
+    """
+    if members.shape[0] < 2:
+        return np.nan
+    overlap = (members[1:] & members[:-1]).sum(axis=1)
+    union = (members[1:] | members[:-1]).sum(axis=1)
+    both = members[1:].any(axis=1) & members[:-1].any(axis=1)
+    if not both.any():
+        return np.nan
+    return float((overlap[both] / union[both]).mean())
+
+def first_true(mask):
+    """
+    Index of the first True in each column, -1 where there is none.
+    """
+    return np.where(mask.any(axis=0), mask.argmax(axis=0), -1)
+
+def find_breakouts(stars, pct=BREAKOUT_PCT, window=BREAKOUT_WINDOW, min_stars=BREAKOUT_MIN_STARS):
+    """
+    Day each repo broke out: the first day its stars are up `pct`% on `window` days earlier.
+    -1 for repos that never broke out.
+    """
+    old = lagged(stars, window)
+    with np.errstate(invalid="ignore"):
+        crossed = (old >= min_stars) & (stars >= old * (1 + pct / 100))
+    return first_true(crossed)
+
+def detection_lead(members, breakout_day, window=BREAKOUT_WINDOW):
+    """
+    For each breakout repo, how many days before its breakout a ranking first put it
+    on the board, looking from `window` days before the breakout to `window` days after.
+    Positive = early, negative = late, NaN = missed (or not a breakout).
+    """
+    days = np.arange(members.shape[0])[:, None]
+    in_window = (breakout_day >= 0) & (days >= breakout_day - window) & (days <= breakout_day + window)
+    first = first_true(members & in_window)
+    return np.where((breakout_day >= 0) & (first >= 0), breakout_day - first, np.nan)
+
+def run_backtest(stars, rankings=None, k=TOP_K, pct=BREAKOUT_PCT, window=BREAKOUT_WINDOW, min_stars=BREAKOUT_MIN_STARS):
+    """
+    Scores every ranking over the whole history. Returns one row per ranking with
+    leaderboard stability and how early it caught breakout repos.
+    """
+    rankings = RANKINGS if rankings is None else rankings
+    breakout_day = find_breakouts(stars, pct, window, min_stars)
+    n_breakouts = int((breakout_day >= 0).sum())
+
+    rows = []
+    for name, score in rankings.items():
+        members = top_k_members(score(stars), k)
+        lead = detection_lead(members, breakout_day, window)
+        detected = int(np.isfinite(lead).sum())
+        rows.append({
+            "ranking": name,
+            "stability": rank_stability(members),
+            "breakouts": n_breakouts,
+            "detected": detected,
+            "detection_rate": detected / n_breakouts if n_breakouts else np.nan,
+            "median_lead_days": float(np.nanmedian(lead)) if detected else np.nan,
+            "mean_lead_days": float(np.nanmean(lead)) if detected else np.nan,
+        })
+    return pd.DataFrame(rows).set_index("ranking")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay Top 10 growth rankings over the repo_stats history.")
+    parser.add_argument("--db", default="repos.db")
+    parser.add_argument("--top", type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    days, repo_names, stars = load_history(args.db)
+    print(f"{len(repo_names)} repos over {len(days)} days")
+    print(run_backtest(stars, k=args.top).to_string())
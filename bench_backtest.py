@@ -0,0 +1,36 @@
+# bench_backtest.py
+# Times a backtest over one year of daily snapshots for 10k repos:
+# building the day x repo matrix from repo_stats-shaped rows, then scoring every ranking.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest import history_matrix, run_backtest
+
+N_REPOS = 10_000
+N_DAYS = 365
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    # Slow background growth with daily noise, plus a 20-day burst for 5% of repos
+    daily_rate = rng.lognormal(mean=-7, sigma=1.0, size=N_REPOS) + rng.normal(0, 0.002, size=(N_DAYS, N_REPOS))
+    bursting = rng.random(N_REPOS) < 0.05
+    burst_start = rng.integers(0, N_DAYS - 20, size=N_REPOS)
+    day = np.arange(N_DAYS)[:, None]
+    daily_rate += np.where(bursting & (day >= burst_start) & (day < burst_start + 20), 0.04, 0.0)
+    stars = rng.integers(500, 50_000, size=N_REPOS) * np.cumprod(1 + np.clip(daily_rate, 0, None), axis=0)
+    repo_names = np.tile([f"owner/repo-{i}" for i in range(N_REPOS)], N_DAYS)
+    timestamps = np.repeat(np.datetime64("2025-01-01T09:00:00") + np.arange(N_DAYS).astype("timedelta64[D]"), N_REPOS)
+    star_counts = stars.round().astype(np.int64).ravel()
+
+    start = time.perf_counter()
+    days, repos, matrix = history_matrix(repo_names, star_counts, pd.Series(timestamps))
+    loaded = time.perf_counter()
+    report = run_backtest(matrix)
+    done = time.perf_counter()
+
+    print(f"{N_REPOS} repos x {N_DAYS} days ({len(star_counts):,} rows)")
+    print(f"build matrix: {loaded - start:.2f}s, backtest {len(report)} rankings: {done - loaded:.2f}s")
+    print(report.to_string())
@@ -0,0 +1,37 @@
+# bench_categorize.py
+# Times categorize_repos on a synthetic snapshot: a cold run (everything vectorized)
+# and a warm run where only 1% of descriptions changed.
+
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from categorize import categorize_repos, CATEGORIES
+
+N_REPOS = 50_000
+
+def make_snapshot(n, seed=0):
+    rng = random.Random(seed)
+    vocab = " ".join(CATEGORIES.values()).split() + [f"word{i}" for i in range(5000)]
+    return pd.DataFrame({
+        "repo_name": [f"owner{i % 7000}/repo-{i}" for i in range(n)],
+        "description": [" ".join(rng.choices(vocab, k=rng.randint(5, 25))) for _ in range(n)],
+    })
+
+if __name__ == "__main__":
+    df = make_snapshot(N_REPOS)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "repos.db")
+
+        start = time.perf_counter()
+        categorize_repos(df, db_path)
+        print(f"cold run, {N_REPOS} repos: {time.perf_counter() - start:.2f}s")
+
+        changed = df.sample(frac=0.01, random_state=1).index
+        df.loc[changed, "description"] = "updated " + df.loc[changed, "description"]
+        start = time.perf_counter()
+        categorize_repos(df, db_path)
+        print(f"warm run, {len(changed)} changed: {time.perf_counter() - start:.2f}s")
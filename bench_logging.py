@@ -0,0 +1,124 @@
+# bench_logging.py
+# Time spent in the calling thread for a crawl-like logging workload
+# (per-repo lines plus a few DataFrame-sized prompts), and the resulting log size, with:
+#   none     - logging disabled (lower bound)
+#   floor    - records created and dropped by a NullHandler: the cost of any stdlib logging call
+#   old      - the previous logging.basicConfig FileHandler + StreamHandler
+#   queue    - log_setup.setup_logging (queue, JSON, truncation, rotation)
+# Each mode runs on the same records twice: every per-repo line logged, and 1 in 100
+# per-repo lines kept by a SamplingFilter, so the writer and sampling are measured apart.
+# A last pass writes to a slow sink (SLOW_SINK_SECONDS per line, like a congested disk or
+# pipe) to show whether the caller waits on the log I/O.
+# Usage: python bench_logging.py
+
+import os
+import sys
+import time
+import queue
+import logging
+import tempfile
+
+from log_setup import setup_logging, SamplingFilter, TruncatingQueueHandler, LogListener
+
+N_REPOS = 50_000
+N_PROMPTS = 20
+PROMPT = "repo_name  stars  daily_diff  daily_pct\n" + "owner/repo  12345  678  5.49\n" * 8000  # ~250 KB
+
+SAMPLE_EVERY = 100
+N_SLOW_REPOS = 2_000
+SLOW_SINK_SECONDS = 0.001
+
+def workload(sample_every, n_repos=N_REPOS):
+    start = time.perf_counter()
+    for i in range(n_repos):
+        logging.info(f"Using existing description for owner/repo-{i}", extra={"sample_every": sample_every})
+        if i % (n_repos // N_PROMPTS) == 0:
+            logging.info(f"Prompt to Claude for daily analysis:\n{PROMPT}")
+    return time.perf_counter() - start
+
+class SlowHandler(logging.Handler):
+    def emit(self, record):
+        self.format(record)
+        time.sleep(SLOW_SINK_SECONDS)
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    for f in root.filters[:]:
+        root.removeFilter(f)
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = True
+
+def log_size(tmp):
+    return sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 1024 / 1024
+
+def configure(mode, log_path):
+    """
+    Sets up the root logger for a mode; returns the listener to stop, if any.
+    """
+    root = logging.getLogger()
+    if mode == "none":
+        root.setLevel(logging.WARNING)
+    elif mode == "floor":
+        root.setLevel(logging.INFO)
+        root.addFilter(SamplingFilter())
+        root.addHandler(logging.NullHandler())
+    elif mode == "old":
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s',
+            handlers=[logging.FileHandler(log_path), logging.StreamHandler()],
+            force=True,
+        )
+        root.addFilter(SamplingFilter())
+    elif mode == "queue":
+        return setup_logging(run_id="bench", log_path=log_path)
+    elif mode == "old-slow":
+        root.setLevel(logging.INFO)
+        root.addHandler(SlowHandler())
+    elif mode == "queue-slow":
+        log_queue = queue.Queue(-1)
+        listener = LogListener(log_queue, SlowHandler(), run_id="bench")
+        root.setLevel(logging.INFO)
+        root.addHandler(TruncatingQueueHandler(log_queue))
+        listener.start()
+        return listener
+    return None
+
+def run(mode, sample_every, n_repos=N_REPOS):
+    reset_root()
+    with tempfile.TemporaryDirectory() as tmp:
+        listener = configure(mode, os.path.join(tmp, "repo_tracker.log"))
+        elapsed = workload(sample_every, n_repos)
+        drain = 0.0
+        if listener:
+            drain_start = time.perf_counter()
+            listener.stop()
+            drain = time.perf_counter() - drain_start
+        reset_root()
+        size = log_size(tmp)
+    return elapsed, drain, size
+
+if __name__ == "__main__":
+    stderr = sys.stderr
+    sys.stderr = open(os.devnull, "w")
+    results = []
+    try:
+        for sample_every in (1, SAMPLE_EVERY):
+            for mode in ("none", "floor", "old", "queue"):
+                results.append((mode, sample_every, N_REPOS) + run(mode, sample_every))
+        for mode in ("none", "old-slow", "queue-slow"):
+            results.append((mode, 1, N_SLOW_REPOS) + run(mode, 1, N_SLOW_REPOS))
+    finally:
+        sys.stderr.close()
+        sys.stderr = stderr
+
+    print(f"{N_REPOS} per-repo lines + {N_PROMPTS} prompts of {len(PROMPT) // 1024} KB; "
+          f"slow sink: {N_SLOW_REPOS} lines at {SLOW_SINK_SECONDS * 1000:.0f} ms each")
+    baseline = {(n, s): elapsed for mode, s, n, elapsed, _, _ in results if mode == "none"}
+    for mode, sample_every, n, elapsed, drain, size in results:
+        overhead = (elapsed - baseline[(n, sample_every)]) / n * 1e6
+        print(f"{mode:>10}, sampling 1/{sample_every:<3}: {elapsed:.3f}s in caller "
+              f"({elapsed / n * 1e6:.1f} us/repo, +{overhead:.1f} us over none), "
+              f"{drain:.3f}s background drain at exit, log size {size:.1f} MB")
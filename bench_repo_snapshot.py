@@ -0,0 +1,96 @@
+# bench_repo_snapshot.py
+# Peak RSS of the crawl -> DataFrame -> Airtable mapping path for N_REPOS synthetic repos,
+# with the old row-dict pipeline ("before") and RepoSnapshotBatch ("after").
+# Each mode runs in its own process so the peaks don't mix.
+# Usage: python bench_repo_snapshot.py [before|after]
+
+import resource
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from repo_snapshot import RepoSnapshot, RepoSnapshotBatch
+
+N_REPOS = 100_000
+PAGE_SIZE = 100
+URL_KEYS = [f"{k}_url" for k in (
+    "archive", "assignees", "blobs", "branches", "collaborators", "comments", "commits", "compare",
+    "contents", "contributors", "deployments", "downloads", "events", "forks", "git_commits", "git_refs",
+    "git_tags", "hooks", "issue_comment", "issue_events", "issues", "keys", "labels", "languages",
+    "merges", "milestones", "notifications", "pulls", "releases", "stargazers", "statuses",
+    "subscribers", "subscription", "tags", "teams", "trees", "clone", "svn", "git", "ssh", "html",
+)]
+AIRTABLE_FIELDS = {
+    "repo_name": "Name", "stars": "Stars", "daily_diff": "Daily Diff", "daily_pct": "Daily %",
+    "weekly_diff": "Weekly Diff", "weekly_pct": "Weekly %", "created_at": "Created At",
+    "updated_at": "Updated At", "description": "Description",
+}
+
+class FakeRepository:
+    """
+    Stand-in for github.Repository: keeps the raw search JSON plus parsed attributes.
+    """
+    def __init__(self, i):
+        self.full_name = f"owner{i % 7000}/repo-{i}"
+        self._rawData = {key: f"https://api.github.com/repos/{self.full_name}/{key}" for key in URL_KEYS}
+        self._rawData.update({"id": i, "full_name": self.full_name, "owner": {"login": f"owner{i % 7000}"}})
+        self.stargazers_count = 500 + i
+        self.forks_count = i // 10
+        self.created_at = datetime(2020, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)
+        self.updated_at = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        self.description = f"Description of repo {i}: " + "an open-source LLM toolkit " * 4
+
+def search_pages():
+    for start in range(0, N_REPOS, PAGE_SIZE):
+        yield [FakeRepository(i) for i in range(start, min(start + PAGE_SIZE, N_REPOS))]
+
+def run_before():
+    results = []       # PaginatedList keeps every page it has loaded
+    data_rows = []
+    for page in search_pages():
+        results.extend(page)
+        for repo in page:
+            data_rows.append({
+                "repo_name": repo.full_name,
+                "stars": repo.stargazers_count,
+                "daily_diff": 10,
+                "daily_pct": 1.0,
+                "weekly_diff": 70,
+                "weekly_pct": 7.0,
+                "created_at": repo.created_at,
+                "updated_at": repo.updated_at,
+                "description": repo.description,
+            })
+    df = pd.DataFrame(data_rows)
+    records_list = df.to_dict(orient="records")
+    mapped = [{"fields": {AIRTABLE_FIELDS[k]: (str(v) if k.endswith("_at") else v) for k, v in r.items()}}
+              for r in records_list]
+    return len(mapped)
+
+def run_after():
+    batch = RepoSnapshotBatch()
+    for page in search_pages():
+        for repo in page:
+            batch.append(RepoSnapshot.from_github(repo, repo.description), 10, 1.0, 70, 7.0)
+    df = batch.to_frame()
+    del batch
+    fields = df[list(AIRTABLE_FIELDS)].rename(columns=AIRTABLE_FIELDS)
+    fields["Created At"] = fields["Created At"].dt.strftime('%Y-%m-%d %H:%M:%S+00:00')
+    fields["Updated At"] = fields["Updated At"].dt.strftime('%Y-%m-%d %H:%M:%S+00:00')
+    names = list(fields.columns)
+    mapped = [{"fields": dict(zip(names, values))} for values in fields.itertuples(index=False, name=None)]
+    return len(mapped)
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        baseline = peak_rss_mb()
+        {"before": run_before, "after": run_after}[sys.argv[1]]()
+        print(f"{sys.argv[1]:>6}: peak RSS {peak_rss_mb():.0f} MB ({peak_rss_mb() - baseline:.0f} MB above import)")
+    else:
+        for mode in ("before", "after"):
+            subprocess.run([sys.executable, __file__, mode], check=True)
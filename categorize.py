@@ -0,0 +1,226 @@
+# categorize.py
+
+import sqlite3
+import hashlib
+from datetime import datetime
+import logging
+
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+N_FEATURES = 2 ** 18
+N_CLUSTERS = 20
+MIN_CATEGORY_SCORE = 0.05
+OTHER_CATEGORY = "Other"
+
+# Seed vocabulary per report category. A repo gets the category whose seed
+# text is most similar (TF-IDF cosine) to its name + description.
+CATEGORIES = {
+    "Agents": "agent agents agentic autonomous multi-agent assistant tool-use workflow automation mcp browser-use computer-use crew",
+    "Devtools": "developer tools ide code coding copilot cli terminal sdk vscode editor debugging testing code-generation programming",
+    "Text Models": "language model llm chat instruct pretrained weights fine-tuning finetuning text generation tokenizer reasoning",
+    "Image & Video Models": "image video generation diffusion stable-diffusion text-to-image text-to-video animation vision multimodal",
+    "Audio Models": "audio speech voice tts text-to-speech asr speech-recognition music whisper transcription",
+    "Infrastructure": "inference serving deployment gpu cuda distributed training quantization kubernetes scalable api gateway vector database",
+    "RAG & Search": "retrieval augmented generation rag knowledge base search embeddings documents pdf semantic",
+}
+
+_vectorizer = HashingVectorizer(
+    n_features=N_FEATURES,
+    alternate_sign=False,
+    norm=None,
+    stop_words="english",
+    dtype=np.float32,
+)
+
+def init_category_table(db_path):
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS repo_categories (
+            repo_full_name TEXT PRIMARY KEY,
+            text_hash TEXT,
+            feature_indices BLOB,
+            feature_counts BLOB,
+            category TEXT,
+            cluster INTEGER,
+            score REAL,
+            updated_at DATETIME
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS cluster_centroids (
+            cluster INTEGER PRIMARY KEY,
+            feature_indices BLOB,
+            feature_values BLOB
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+def repo_text(repo_name, description):
+    """
+    Text that gets vectorized: the repo name split into words plus its description.
+    """
+    words = repo_name.replace("/", " ").replace("-", " ").replace("_", " ")
+    return f"{words} {description}" if isinstance(description, str) else words
+
+def _text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def load_feature_matrix(conn, repo_names, texts):
+    """
+    Returns the hashed term-count matrix (one row per repo) and the rows that had to be recomputed.
+    Cached rows are reused as long as the repo's text hash is unchanged.
+    """
+    cached = {}
+    c = conn.cursor()
+    for start in range(0, len(repo_names), 900):
+        chunk = repo_names[start:start + 900]
+        c.execute(
+            f"SELECT repo_full_name, text_hash, feature_indices, feature_counts FROM repo_categories "
+            f"WHERE repo_full_name IN ({','.join('?' * len(chunk))})",
+            chunk,
+        )
+        for name, text_hash, indices, counts in c.fetchall():
+            cached[name] = (text_hash, indices, counts)
+
+    hashes = [_text_hash(t) for t in texts]
+    rows = [None] * len(repo_names)
+    stale = []
+    for i, name in enumerate(repo_names):
+        if name in cached and cached[name][0] == hashes[i]:
+            rows[i] = (np.frombuffer(cached[name][1], dtype=np.int32),
+                       np.frombuffer(cached[name][2], dtype=np.float32))
+        else:
+            stale.append(i)
+
+    fresh = _vectorizer.transform([texts[i] for i in stale]).tocsr() if stale else None
+    updates = []
+    for j, i in enumerate(stale):
+        lo, hi = fresh.indptr[j], fresh.indptr[j + 1]
+        indices = fresh.indices[lo:hi].astype(np.int32)
+        counts = fresh.data[lo:hi].astype(np.float32)
+        rows[i] = (indices, counts)
+        updates.append((repo_names[i], hashes[i], indices.tobytes(), counts.tobytes()))
+
+    lengths = np.fromiter((len(r[0]) for r in rows), dtype=np.int64, count=len(rows))
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    indices = np.concatenate([r[0] for r in rows]) if rows else np.empty(0, np.int32)
+    data = np.concatenate([r[1] for r in rows]) if rows else np.empty(0, np.float32)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(rows), N_FEATURES))
+    return matrix, updates
+
+def assign_categories(tfidf, transformer):
+    """
+    Cosine similarity of every repo against every category seed, as one sparse product.
+    Returns (category labels, best scores).
+    """
+    names = list(CATEGORIES)
+    seeds = transformer.transform(_vectorizer.transform([CATEGORIES[n] for n in names]))
+    scores = (tfidf @ seeds.T).toarray()
+    best = scores.argmax(axis=1)
+    best_score = scores[np.arange(len(best)), best]
+    labels = np.array(names, dtype=object)[best]
+    labels[best_score < MIN_CATEGORY_SCORE] = OTHER_CATEGORY
+    return labels, best_score
+
+def load_centroids(conn, k):
+    """
+    The previous run's cluster centroids as a dense k x N_FEATURES array,
+    or None if there are none or the previous run used a different k.
+    """
+    rows = conn.execute("SELECT cluster, feature_indices, feature_values FROM cluster_centroids").fetchall()
+    if len(rows) != k or {r[0] for r in rows} != set(range(k)):
+        return None
+    centroids = np.zeros((k, N_FEATURES), dtype=np.float64)
+    for cluster, indices, values in rows:
+        centroids[cluster, np.frombuffer(indices, dtype=np.int32)] = np.frombuffer(values, dtype=np.float32)
+    return centroids
+
+def save_centroids(conn, centroids):
+    """
+    Stores centroids sparsely (only the features any repo in the cluster has).
+    """
+    rows = []
+    for cluster, centroid in enumerate(centroids):
+        indices = np.flatnonzero(centroid).astype(np.int32)
+        rows.append((cluster, indices.tobytes(), centroid[indices].astype(np.float32).tobytes()))
+    conn.execute("DELETE FROM cluster_centroids")
+    conn.executemany(
+        "INSERT INTO cluster_centroids (cluster, feature_indices, feature_values) VALUES (?, ?, ?)", rows
+    )
+
+def assign_clusters(tfidf, n_clusters=N_CLUSTERS, init_centroids=None):
+    """
+    Clusters the repos. Seeding from the previous run's centroids keeps cluster
+    IDs comparable between runs. Returns (labels, centroids).
+    """
+    if tfidf.shape[0] == 0:
+        return np.empty(0, dtype=np.int64), None
+    k = min(n_clusters, tfidf.shape[0])
+    if init_centroids is not None and len(init_centroids) == k:
+        model = MiniBatchKMeans(n_clusters=k, init=init_centroids, n_init=1, random_state=0, batch_size=4096)
+    else:
+        model = MiniBatchKMeans(n_clusters=k, init="random", n_init=1, random_state=0, batch_size=4096)
+    labels = model.fit_predict(tfidf)
+    return labels, model.cluster_centers_
+
+def categorize_repos(df, db_path, n_clusters=N_CLUSTERS):
+    """
+    Adds 'category' and 'cluster' columns to the snapshot DataFrame and stores them in repo_categories.
+    Only repos whose name/description changed since the last run get re-vectorized.
+    Clustering starts from the previous run's centroids, so a cluster ID means the
+    same group from run to run (until n_clusters changes).
+    """
+    init_category_table(db_path)
+    repo_names = df["repo_name"].astype(str).tolist()
+    descriptions = df["description"].tolist() if "description" in df.columns else [None] * len(df)
+    texts = [repo_text(n, d) for n, d in zip(repo_names, descriptions)]
+
+    conn = sqlite3.connect(db_path)
+    counts, updates = load_feature_matrix(conn, repo_names, texts)
+
+    transformer = TfidfTransformer(sublinear_tf=True)
+    tfidf = transformer.fit_transform(counts)
+    categories, scores = assign_categories(tfidf, transformer)
+    clusters, centroids = assign_clusters(tfidf, n_clusters, load_centroids(conn, min(n_clusters, len(repo_names))))
+
+    now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    c = conn.cursor()
+    c.executemany("""
+        INSERT INTO repo_categories (repo_full_name, text_hash, feature_indices, feature_counts, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(repo_full_name) DO UPDATE SET
+            text_hash = excluded.text_hash,
+            feature_indices = excluded.feature_indices,
+            feature_counts = excluded.feature_counts,
+            updated_at = excluded.updated_at
+    """, [u + (now,) for u in updates])
+    c.executemany(
+        "UPDATE repo_categories SET category = ?, cluster = ?, score = ? WHERE repo_full_name = ?",
+        zip(categories.tolist(), clusters.tolist(), scores.astype(float).tolist(), repo_names),
+    )
+    if centroids is not None:
+        save_centroids(conn, centroids)
+    conn.commit()
+    conn.close()
+    logging.info(f"Categorized {len(repo_names)} repos ({len(updates)} re-vectorized).")
+
+    df = df.copy()
+    df["category"] = categories
+    df["cluster"] = clusters
+    return df
+
+def top_by_category(df, column, n=3):
+    """
+    Returns [(category, top-n rows by `column`)], largest categories first, 'Other' last.
+    """
+    sizes = df["category"].value_counts()
+    order = [c for c in sizes.index if c != OTHER_CATEGORY]
+    if OTHER_CATEGORY in sizes.index:
+        order.append(OTHER_CATEGORY)
+    top = df.sort_values(column, ascending=False).groupby("category", sort=False).head(n)
+    return [(category, top[top["category"] == category]) for category in order]
@@ -3,7 +3,6 @@ import os
 import sqlite3
 from datetime import datetime, timedelta
 from pyairtable import Table
-import pandas as pd
 import logging
 import json
 import markdown
@@ -15,6 +14,9 @@ import anthropic
 from dotenv import load_dotenv
 import os
 
+from repo_snapshot import RepoSnapshot, RepoSnapshotBatch
+from log_setup import setup_logging, LOG_PATH
+
 load_dotenv()
 
 AIRTABLE_API_KEY = os.getenv("AIRTABLE_API_KEY")
@@ -32,6 +34,8 @@ INSTALLATION_ID = os.getenv("INSTALLATION_ID")
 DB_PATH = "repos.db"
 SEARCH_QUERY = "(gpt OR llm OR 'generative ai OR finetuning OR agent') in:name,description,readme stars:>500"
 MAX_REPOS = 800
+SEARCH_RESULT_CAP = 1000   # GitHub search returns at most this many results per query
+STORE_EVERY = 100          # write snapshots to repo_stats every this many repos
 
 with open(PRIVATE_KEY_PATH, 'r') as key_file:
     private_key = key_file.read()
@@ -47,14 +51,10 @@ github_client = get_github_client()
 ANTHROPIC_API_KEY = ANTHROPIC_TOKEN = os.getenv("ANTHROPIC_TOKEN")
 anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_TOKEN)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('repo_tracker.log'),
-        logging.StreamHandler()
-    ]
-)
+# JSON lines to a rotating, gzipped repo_tracker.log, written from a background thread.
+# Processes running side by side (e.g. crawl workers) must each set their own LOG_PATH.
+log_listener = setup_logging(run_id=os.getenv("RUN_ID"), log_path=os.getenv("LOG_PATH", LOG_PATH))
+RUN_ID = log_listener.run_id
 
 def init_database():
     conn = sqlite3.connect(DB_PATH)
@@ -76,39 +76,40 @@ def init_database():
 
 def summarize_readme_if_needed(repo):
     if repo.description and repo.description.strip():
-        logging.info(f"Using existing description for {repo.full_name}")
+        logging.info(f"Using existing description for {repo.full_name}", extra={"sample_every": 100})
         return repo.description
     try:
         readme_content = repo.get_readme().decoded_content.decode("utf-8")
-        cleaned_text = ' '.join(readme_content.split())[:1000]
-        prompt = f"Technical one-line description of this project:\n{cleaned_text}"
-        response = anthropic_client.messages.create(
-            model="claude-3-5-sonnet-latest",
-            max_tokens=300,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.content[0].text
+        return summarize_readme_text(readme_content)
     except Exception as e:
         logging.error(f"Error summarizing README: {e}")
         return None
 
-def store_repo_data(repo_full_name, stars, forks, created_at, updated_at, description):
+def summarize_readme_text(readme_content):
+    cleaned_text = ' '.join(readme_content.split())[:1000]
+    prompt = f"Technical one-line description of this project:\n{cleaned_text}"
+    response = anthropic_client.messages.create(
+        model="claude-3-5-sonnet-latest",
+        max_tokens=300,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    return response.content[0].text
+
+def store_repo_data_batch(rows):
+    """
+    Inserts many snapshots into repo_stats in a single transaction.
+    `rows` is any iterable of RepoSnapshot.db_row() tuples, e.g. RepoSnapshotBatch.db_rows().
+    """
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    c.execute("""
+    c.executemany("""
         INSERT INTO repo_stats (repo_full_name, star_count, forks_count, timestamp, created_at, updated_at, description)
         VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        repo_full_name,
-        stars,
-        forks,
-        datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
-        created_at.strftime('%Y-%m-%d %H:%M:%S'),
-        updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-        description,
-    ))
+    """, rows)
+    inserted = c.rowcount
     conn.commit()
     conn.close()
+    return inserted
 
 def get_historical_star_count(repo_full_name, days_ago=7):
     conn = sqlite3.connect(DB_PATH)
@@ -167,48 +168,68 @@ def get_db_row_count():
     conn.close()
     return row[0] if row else 0
 
+def iter_search_results(results):
+    """
+    Yields repos from a search one page at a time. Unlike iterating the
+    PaginatedList directly, pages already seen are not kept alive.
+    Stops at the end of the results or at GitHub's 1000-result search cap
+    (asking for a page past it is a 422).
+    """
+    available = min(results.totalCount, SEARCH_RESULT_CAP)
+    seen = 0
+    page = 0
+    while seen < available:
+        repos = results.get_page(page)
+        if not repos:
+            return
+        yield from repos
+        seen += len(repos)
+        page += 1
+
 def run_repo_tracking():
     logging.info("Initializing DB...")
     init_database()
     logging.info(f"Searching GitHub with query:\n{SEARCH_QUERY}")
     results = github_client.search_repositories(query=SEARCH_QUERY, sort='stars', order='desc')
 
-    data_rows = []
+    batch = RepoSnapshotBatch()
     count = 0
-    for repo in results:
-        if MAX_REPOS and count >= MAX_REPOS:
-            break
-        
-        repo_full_name = repo.full_name
-        stars = repo.stargazers_count
-        forks = repo.forks_count
-        created_at = repo.created_at
-        updated_at = repo.updated_at
-        
-        description = summarize_readme_if_needed(repo)
-        store_repo_data(repo_full_name, stars, forks, created_at, updated_at, description)
-        
-        daily_diff, daily_pct, weekly_diff, weekly_pct = compute_star_diff(repo_full_name, stars)
-        row = {
-            "repo_name": repo_full_name,
-            "stars": stars,
-            "daily_diff": daily_diff,
-            "daily_pct": daily_pct,
-            "weekly_diff": weekly_diff,
-            "weekly_pct": weekly_pct,
-            "created_at": created_at,
-            "updated_at": updated_at,
-            "description": description
-        }
-        data_rows.append(row)
-        count += 1
+    stored = 0
+    try:
+        for repo in iter_search_results(results):
+            if MAX_REPOS and count >= MAX_REPOS:
+                break
+
+            snapshot = RepoSnapshot.from_github(repo, summarize_readme_if_needed(repo))
+            daily_diff, daily_pct, weekly_diff, weekly_pct = compute_star_diff(snapshot.repo_name, snapshot.stars)
+            batch.append(snapshot, daily_diff, daily_pct, weekly_diff, weekly_pct)
+            count += 1
+            if count - stored >= STORE_EVERY:
+                store_repo_data_batch(batch.db_rows(stored))
+                stored = count
+    finally:
+        # Keep what was crawled (and any generated descriptions) even if the crawl fails midway
+        if count > stored:
+            store_repo_data_batch(batch.db_rows(stored))
     logging.info(f"Processed {count} repos.")
-    
-    df = pd.DataFrame(data_rows)
+
+    df = batch.to_frame()
     df.to_csv("latest_repos.csv", index=False)
     logging.info("Saved current snapshot to latest_repos.csv")
     return df
 
+AIRTABLE_FIELDS = {
+    "repo_name": "Name",
+    "stars": "Stars",
+    "daily_diff": "Daily Diff",
+    "daily_pct": "Daily %",
+    "weekly_diff": "Weekly Diff",
+    "weekly_pct": "Weekly %",
+    "created_at": "Created At",
+    "updated_at": "Updated At",
+    "description": "Description",
+}
+
 def sync_df_to_airtable(df):
     """
     Overwrites (or upserts) all rows in Airtable from the given DataFrame.
@@ -219,9 +240,6 @@ def sync_df_to_airtable(df):
     # Initialize the table
     table = Table(AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_TABLE_NAME)
 
-    # Convert your DataFrame to a list of dictionaries
-    records_list = df.to_dict(orient="records")
-
     # OPTIONAL: If you want to start fresh each time, you can delete existing records
     # (Beware if you want to keep old data or have multiple runs a day)
     # existing_records = table.all()
@@ -233,22 +251,18 @@ def sync_df_to_airtable(df):
     # This requires you specify which field is your "unique key" in Airtable
     # Make sure your table in Airtable has a "Repo Name" (or something) that lines up with 'repo_name' below
     # If your primary field in Airtable is the 'Name' column, rename accordingly
-    def record_mapper(record):
-        # Map your DataFrame fields to Airtable fields
-        # e.g. "Name" might be the primary field in Airtable
-        return {
-            "Name": record["repo_name"],
-            "Stars": record["stars"],
-            "Daily Diff": record["daily_diff"],
-            "Daily %": record["daily_pct"],
-            "Weekly Diff": record["weekly_diff"],
-            "Weekly %": record["weekly_pct"],
-            "Created At": str(record["created_at"]),
-            "Updated At": str(record["updated_at"]),
-            "Description": record["description"],
-        }
-
-    mapped_records = [{"fields": record_mapper(r)} for r in records_list]
+    # Map DataFrame columns to Airtable fields
+    # e.g. "Name" might be the primary field in Airtable
+    fields = df[list(AIRTABLE_FIELDS)].rename(columns=AIRTABLE_FIELDS)
+    # Same text as the UTC datetimes from PyGithub used to produce, whatever the column holds
+    # (missing timestamps are sent as empty fields)
+    for column in ("Created At", "Updated At"):
+        fields[column] = fields[column].dt.strftime('%Y-%m-%d %H:%M:%S+00:00').astype(object).where(fields[column].notna(), None)
+    field_names = list(fields.columns)
+    mapped_records = [
+        {"fields": dict(zip(field_names, values))}
+        for values in fields.itertuples(index=False, name=None)
+    ]
 
     # Upsert them in batches. 
     # 'field_name' must match the primary field in your Airtable if you want to match existing rows.
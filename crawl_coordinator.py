@@ -0,0 +1,396 @@
+# crawl_coordinator.py
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import subprocess
+import logging
+
+MAX_ATTEMPTS = 3
+LEASE_SECONDS = 300
+RETRY_DELAY_SECONDS = 30
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_RESULTS = 1000   # GitHub search never returns more than this per query
+
+# Each search query starts split into these star ranges (matching SEARCH_QUERY's stars:>500).
+# A shard that still matches more than 1000 repos is split in half by the worker that finds it.
+STAR_SHARDS = [(501, 700), (701, 1000), (1001, 1500), (1501, 2500), (2501, 5000), (5001, 10000), (10001, None)]
+
+def connect(db_path):
+    """
+    Connection in autocommit mode so leasing can use explicit BEGIN IMMEDIATE transactions.
+    WAL needs shared memory, so every worker must run on the host that holds repos.db.
+    """
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+def init_work_queue(db_path):
+    conn = connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS work_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            kind TEXT,
+            payload TEXT,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            available_at REAL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            UNIQUE(run_id, kind, payload)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_results (
+            run_id TEXT,
+            repo_full_name TEXT,
+            star_count INTEGER,
+            forks_count INTEGER,
+            timestamp DATETIME,
+            created_at DATETIME,
+            updated_at DATETIME,
+            description TEXT,
+            PRIMARY KEY (run_id, repo_full_name)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_runs (
+            run_id TEXT PRIMARY KEY,
+            phase TEXT DEFAULT 'search',
+            max_repos INTEGER,
+            truncated INTEGER DEFAULT 0,
+            merged_at DATETIME
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_work_queue_status ON work_queue (run_id, status, available_at)")
+    conn.close()
+
+def enqueue_tasks(conn, run_id, kind, payloads):
+    """
+    Adds tasks to the queue; a (run_id, kind, payload) that already exists is ignored.
+    """
+    conn.executemany(
+        "INSERT OR IGNORE INTO work_queue (run_id, kind, payload) VALUES (?, ?, ?)",
+        [(run_id, kind, json.dumps(p, sort_keys=True)) for p in payloads],
+    )
+
+def lease_task(conn, run_id, worker_id, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, now=None):
+    """
+    Atomically claims the oldest runnable task: pending and available, or leased with an expired lease.
+    Returns (task_id, kind, payload) or None.
+    """
+    now = time.time() if now is None else now
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("""
+            UPDATE work_queue SET status = 'failed', last_error = 'lease expired'
+            WHERE run_id = ? AND status = 'leased' AND lease_expires < ? AND attempts >= ?
+        """, (run_id, now, max_attempts))
+        row = conn.execute("""
+            SELECT id, kind, payload FROM work_queue
+            WHERE run_id = ?
+              AND ((status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?))
+            ORDER BY id
+            LIMIT 1
+        """, (run_id, now, now)).fetchone()
+        if row is None and _start_enrichment(conn, run_id):
+            row = conn.execute("""
+                SELECT id, kind, payload FROM work_queue
+                WHERE run_id = ? AND status = 'pending' AND available_at <= ?
+                ORDER BY id
+                LIMIT 1
+            """, (run_id, now)).fetchone()
+        if row:
+            conn.execute("""
+                UPDATE work_queue
+                SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE id = ?
+            """, (worker_id, now + lease_seconds, row[0]))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if not row:
+        return None
+    return row[0], row[1], json.loads(row[2])
+
+def _start_enrichment(conn, run_id):
+    """
+    Second phase of a run: once every search task is settled, queues README
+    enrichment only for the repos the merge will keep (the top max_repos by stars)
+    that have no description. Runs inside the caller's transaction.
+    Returns True if the run moved from 'search' to 'enrich'.
+    """
+    run = conn.execute("SELECT phase, max_repos FROM crawl_runs WHERE run_id = ?", (run_id,)).fetchone()
+    if not run or run[0] != "search":
+        return False
+    busy = conn.execute(
+        "SELECT COUNT(*) FROM work_queue WHERE run_id = ? AND status IN ('pending', 'leased')", (run_id,)
+    ).fetchone()[0]
+    if busy:
+        return False
+    missing = conn.execute(f"""
+        SELECT repo_full_name, description FROM (
+            SELECT repo_full_name, description FROM crawl_results
+            WHERE run_id = ?
+            ORDER BY star_count DESC, repo_full_name
+            {"LIMIT ?" if run[1] else ""}
+        ) WHERE description IS NULL
+    """, (run_id, run[1]) if run[1] else (run_id,)).fetchall()
+    enqueue_tasks(conn, run_id, "enrich", [{"repo_full_name": name} for name, _ in missing])
+    conn.execute("UPDATE crawl_runs SET phase = 'enrich' WHERE run_id = ?", (run_id,))
+    logging.info(f"Crawl {run_id} search done, queued {len(missing)} README enrichments.")
+    return True
+
+def _mark_done(conn, task_id, worker_id):
+    return conn.execute(
+        "UPDATE work_queue SET status = 'done', lease_expires = NULL WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+        (task_id, worker_id),
+    ).rowcount
+
+def complete_task(conn, task_id, worker_id, run_id, results=(), new_tasks=(), truncated=False):
+    """
+    Marks a task done and stores its results in the same transaction.
+    Returns False (and stores nothing) if the lease was lost to another worker.
+
+    results: crawl_results rows (repo_full_name, stars, forks, timestamp, created_at, updated_at, description)
+    new_tasks: (kind, payload) pairs to enqueue, e.g. the next search page
+    truncated: the search shard could not be crawled completely (see mark_truncated)
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        owned = _mark_done(conn, task_id, worker_id)
+        if owned:
+            conn.executemany("""
+                INSERT INTO crawl_results (run_id, repo_full_name, star_count, forks_count, timestamp, created_at, updated_at, description)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(run_id, repo_full_name) DO UPDATE SET
+                    star_count = excluded.star_count,
+                    forks_count = excluded.forks_count,
+                    timestamp = excluded.timestamp,
+                    created_at = excluded.created_at,
+                    updated_at = excluded.updated_at,
+                    description = COALESCE(excluded.description, crawl_results.description)
+            """, [(run_id,) + tuple(r) for r in results])
+            for kind, payload in new_tasks:
+                enqueue_tasks(conn, run_id, kind, [payload])
+            if truncated:
+                mark_truncated(conn, run_id)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return bool(owned)
+
+def update_description(conn, task_id, worker_id, run_id, repo_full_name, description):
+    """
+    Completes an enrichment task by filling in the repo's description.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        owned = _mark_done(conn, task_id, worker_id)
+        if owned:
+            conn.execute(
+                "UPDATE crawl_results SET description = ? WHERE run_id = ? AND repo_full_name = ?",
+                (description, run_id, repo_full_name),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return bool(owned)
+
+def fail_task(conn, task_id, worker_id, error, retry_in=RETRY_DELAY_SECONDS, max_attempts=MAX_ATTEMPTS,
+              count_attempt=True, now=None):
+    """
+    Gives a task back after an error. It is retried after `retry_in` seconds until
+    max_attempts is reached, then marked failed. count_attempt=False releases it
+    without using up an attempt (e.g. the worker's token was rate limited).
+    """
+    now = time.time() if now is None else now
+    conn.execute("""
+        UPDATE work_queue
+        SET status = CASE WHEN attempts - :refund >= :max_attempts THEN 'failed' ELSE 'pending' END,
+            attempts = attempts - :refund,
+            available_at = :available_at,
+            lease_owner = NULL,
+            lease_expires = NULL,
+            last_error = :error
+        WHERE id = :task_id AND lease_owner = :worker_id AND status = 'leased'
+    """, {
+        "refund": 0 if count_attempt else 1,
+        "max_attempts": max_attempts,
+        "available_at": now + retry_in,
+        "error": str(error)[:500],
+        "task_id": task_id,
+        "worker_id": worker_id,
+    })
+
+def queue_counts(conn, run_id):
+    """
+    Returns {status: count} for a run.
+    """
+    return dict(conn.execute(
+        "SELECT status, COUNT(*) FROM work_queue WHERE run_id = ? GROUP BY status", (run_id,)
+    ).fetchall())
+
+def run_finished(conn, run_id):
+    """
+    True once nothing is pending or leased and the run is past its search phase
+    (a run's search phase ends when a worker leasing from the drained queue starts enrichment).
+    """
+    counts = queue_counts(conn, run_id)
+    if not counts or counts.get("pending") or counts.get("leased"):
+        return False
+    run = conn.execute("SELECT phase FROM crawl_runs WHERE run_id = ?", (run_id,)).fetchone()
+    return not run or run[0] != "search"
+
+def strip_stars(query):
+    return re.sub(r"\s*stars:\S+", "", query).strip()
+
+def star_query(base, lo, hi):
+    """
+    `base` restricted to lo..hi stars (hi=None for no upper bound).
+    """
+    return f"{base} stars:{lo}..{hi}" if hi else f"{base} stars:>={lo}"
+
+def shard_query(query, star_ranges=STAR_SHARDS):
+    """
+    Replaces any stars: qualifier in `query` with one qualifier per star range.
+    """
+    base = strip_stars(query)
+    return [star_query(base, lo, hi) for lo, hi in star_ranges]
+
+def split_star_range(lo, hi):
+    """
+    Halves a star range; an open-ended range splits at twice its lower bound.
+    Returns None when the range is a single star count.
+    """
+    if hi is None:
+        return [(lo, lo * 2 - 1), (lo * 2, None)]
+    if hi <= lo:
+        return None
+    mid = (lo + hi) // 2
+    return [(lo, mid), (mid + 1, hi)]
+
+def mark_truncated(conn, run_id):
+    """
+    Records that a shard of the run could not be crawled completely.
+    """
+    conn.execute("UPDATE crawl_runs SET truncated = truncated + 1 WHERE run_id = ?", (run_id,))
+
+def plan_crawl(db_path, run_id, query, star_ranges=STAR_SHARDS, per_page=SEARCH_PAGE_SIZE, max_repos=None):
+    """
+    Enqueues the first search page of every shard. Workers enqueue further pages as
+    results come in; once the search is done, README enrichment is queued for the
+    top max_repos repos only. Re-planning an existing run_id changes nothing.
+    """
+    init_work_queue(db_path)
+    conn = connect(db_path)
+    conn.execute("INSERT OR IGNORE INTO crawl_runs (run_id, max_repos) VALUES (?, ?)", (run_id, max_repos or None))
+    base = strip_stars(query)
+    enqueue_tasks(conn, run_id, "search", [
+        {"query": base, "stars": [lo, hi], "page": 1, "per_page": per_page} for lo, hi in star_ranges
+    ])
+    conn.close()
+    logging.info(f"Planned crawl {run_id}: {len(star_ranges)} search shards.")
+    return len(star_ranges)
+
+def merge_results(db_path, run_id, max_repos=None, allow_partial=False):
+    """
+    Copies a finished run's results into repo_stats (most-starred first, up to max_repos,
+    defaulting to the max_repos the run was planned with). Each run is merged at most once.
+    Refuses to merge a partial run (failed tasks, or shards cut off at the search cap)
+    unless allow_partial is set. Returns rows merged.
+    """
+    conn = connect(db_path)
+    try:
+        failed = queue_counts(conn, run_id).get("failed", 0)
+        run = conn.execute("SELECT truncated FROM crawl_runs WHERE run_id = ?", (run_id,)).fetchone()
+        truncated = run[0] if run else 0
+        if (failed or truncated) and not allow_partial:
+            logging.error(f"Not merging crawl {run_id}: {failed} tasks failed, {truncated} shards truncated "
+                          f"(pass allow_partial to merge anyway).")
+            return 0
+        if failed or truncated:
+            logging.warning(f"Merging partial crawl {run_id}: {failed} tasks failed, {truncated} shards truncated.")
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT OR IGNORE INTO crawl_runs (run_id, phase) VALUES (?, 'enrich')", (run_id,))
+        run_max = conn.execute("SELECT max_repos FROM crawl_runs WHERE run_id = ?", (run_id,)).fetchone()[0]
+        max_repos = max_repos or run_max
+        claimed = conn.execute(
+            "UPDATE crawl_runs SET merged_at = datetime('now') WHERE run_id = ? AND merged_at IS NULL", (run_id,)
+        ).rowcount
+        if not claimed:
+            conn.execute("COMMIT")
+            logging.warning(f"Crawl {run_id} was already merged into repo_stats, skipping.")
+            return 0
+        merged = conn.execute(f"""
+            INSERT INTO repo_stats (repo_full_name, star_count, forks_count, timestamp, created_at, updated_at, description)
+            SELECT repo_full_name, star_count, forks_count, timestamp, created_at, updated_at, description
+            FROM crawl_results
+            WHERE run_id = ?
+            ORDER BY star_count DESC, repo_full_name
+            {"LIMIT ?" if max_repos else ""}
+        """, (run_id, max_repos) if max_repos else (run_id,)).rowcount
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    logging.info(f"Merged {merged} repos from crawl {run_id} into repo_stats.")
+    return merged
+
+def wait_for_run(db_path, run_id, poll_seconds=2, timeout=None):
+    conn = connect(db_path)
+    started = time.time()
+    try:
+        while not run_finished(conn, run_id):
+            if timeout is not None and time.time() - started > timeout:
+                raise TimeoutError(f"Crawl {run_id} did not finish: {queue_counts(conn, run_id)}")
+            time.sleep(poll_seconds)
+        return queue_counts(conn, run_id)
+    finally:
+        conn.close()
+
+def spawn_local_workers(db_path, run_id, n_workers, extra_args=()):
+    """
+    Starts n crawl_worker.py processes on this host. Their logs carry the crawl's
+    run_id, and each writes its own log file (see crawl_worker.py).
+    """
+    worker_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crawl_worker.py")
+    env = dict(os.environ, RUN_ID=run_id)
+    return [
+        subprocess.Popen([sys.executable, worker_script, "--db", db_path, "--run-id", run_id,
+                          "--worker-index", str(i), *extra_args], env=env)
+        for i in range(n_workers)
+    ]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan a distributed crawl, wait for workers and merge the results.")
+    parser.add_argument("--run-id", default=time.strftime("%Y-%m-%d_%H-%M-%S"))
+    parser.add_argument("--workers", type=int, default=0, help="worker processes to start on this host")
+    parser.add_argument("--max-repos", type=int, default=None, help="defaults to MAX_REPOS")
+    parser.add_argument("--allow-partial", action="store_true", help="merge even if some tasks failed")
+    args = parser.parse_args()
+
+    # core_monitor sets up logging on import, tagged with RUN_ID
+    os.environ["RUN_ID"] = args.run_id
+    from core_monitor import init_database, DB_PATH, SEARCH_QUERY, MAX_REPOS
+    args.max_repos = args.max_repos or MAX_REPOS
+
+    init_database()
+    plan_crawl(DB_PATH, args.run_id, SEARCH_QUERY, max_repos=args.max_repos)
+    workers = spawn_local_workers(DB_PATH, args.run_id, args.workers)
+    try:
+        counts = wait_for_run(DB_PATH, args.run_id)
+        logging.info(f"Crawl {args.run_id} finished: {counts}")
+        merge_results(DB_PATH, args.run_id, args.max_repos, allow_partial=args.allow_partial)
+    finally:
+        for worker in workers:
+            worker.wait()
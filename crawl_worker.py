@@ -0,0 +1,235 @@
+# crawl_worker.py
+
+import os
+import time
+import socket
+import argparse
+from datetime import datetime
+import logging
+
+import requests
+
+from crawl_coordinator import (
+    connect,
+    lease_task,
+    complete_task,
+    update_description,
+    fail_task,
+    mark_truncated,
+    star_query,
+    split_star_range,
+    run_finished,
+    LEASE_SECONDS,
+    SEARCH_MAX_RESULTS,
+)
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+TOKEN_REFRESH_MARGIN = 5 * 60   # refresh installation tokens 5 minutes before they expire
+
+
+class RateLimited(Exception):
+    def __init__(self, installation_id, reset_at):
+        super().__init__(f"installation {installation_id} rate limited until {reset_at:.0f}")
+        self.installation_id = installation_id
+        self.reset_at = reset_at
+
+
+class TokenPool:
+    """
+    Installation tokens for several GitHub App installations, each with its own rate limit.
+
+    `fetch_token(installation_id)` returns (token, expires_at_epoch). A worker
+    starts on installation `preferred % n` and moves to the next one whose
+    limit isn't exhausted when it gets rate limited.
+    """
+
+    def __init__(self, installation_ids, fetch_token, preferred=0, clock=time.time):
+        if not installation_ids:
+            raise ValueError("TokenPool needs at least one installation id")
+        self.installation_ids = list(installation_ids)
+        self.fetch_token = fetch_token
+        self.clock = clock
+        self._current = preferred % len(self.installation_ids)
+        self._tokens = {}           # installation_id -> (token, expires_at)
+        self._exhausted_until = {}  # installation_id -> reset epoch
+
+    def acquire(self):
+        """
+        Returns (installation_id, token) for the first usable installation,
+        or raises RateLimited with the earliest reset time if none is.
+        """
+        now = self.clock()
+        n = len(self.installation_ids)
+        for offset in range(n):
+            installation_id = self.installation_ids[(self._current + offset) % n]
+            if self._exhausted_until.get(installation_id, 0) > now:
+                continue
+            self._current = (self._current + offset) % n
+            token, expires_at = self._tokens.get(installation_id, (None, 0))
+            if expires_at - TOKEN_REFRESH_MARGIN <= now:
+                token, expires_at = self.fetch_token(installation_id)
+                self._tokens[installation_id] = (token, expires_at)
+            return installation_id, token
+        raise RateLimited(None, min(self._exhausted_until.values()))
+
+    def mark_exhausted(self, installation_id, reset_at):
+        self._exhausted_until[installation_id] = reset_at
+
+
+class GitHubREST:
+    """
+    The two GitHub REST calls the crawl needs, authenticated through a TokenPool.
+    """
+
+    def __init__(self, token_pool, api_url=GITHUB_API_URL, session=None):
+        self.token_pool = token_pool
+        self.api_url = api_url.rstrip("/")
+        self.session = session or requests.Session()
+
+    def _get(self, path, params=None, accept="application/vnd.github+json"):
+        installation_id, token = self.token_pool.acquire()
+        r = self.session.get(
+            f"{self.api_url}{path}",
+            params=params,
+            headers={"Authorization": f"Bearer {token}", "Accept": accept},
+            timeout=30,
+        )
+        if r.status_code in (403, 429) and r.headers.get("X-RateLimit-Remaining") == "0":
+            reset_at = float(r.headers.get("X-RateLimit-Reset", time.time() + 60))
+            self.token_pool.mark_exhausted(installation_id, reset_at)
+            raise RateLimited(installation_id, reset_at)
+        return r
+
+    def search_repositories(self, query, page, per_page):
+        """
+        Returns (items, total_count). total_count can exceed the 1000 results search will return.
+        """
+        r = self._get("/search/repositories",
+                      params={"q": query, "sort": "stars", "order": "desc", "page": page, "per_page": per_page})
+        r.raise_for_status()
+        body = r.json()
+        return body.get("items", []), body.get("total_count", 0)
+
+    def get_readme(self, repo_full_name):
+        r = self._get(f"/repos/{repo_full_name}/readme", accept="application/vnd.github.raw+json")
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        return r.text
+
+def _db_time(github_time):
+    """
+    '2025-01-27T10:44:02Z' -> '2025-01-27 10:44:02' (the format repo_stats uses).
+    """
+    if not github_time:
+        return None
+    return datetime.strptime(github_time, "%Y-%m-%dT%H:%M:%SZ").strftime('%Y-%m-%d %H:%M:%S')
+
+def handle_search(client, payload):
+    """
+    Runs one search page. Returns (crawl_results rows, follow-up tasks, truncated).
+    Repos without a description are enriched later, once the run knows which ones it keeps.
+
+    If the shard matches more than SEARCH_MAX_RESULTS repos, its star range is split in
+    half and the halves are queued instead. A single star count that still matches too
+    many is crawled up to the cap and reported as truncated.
+    """
+    lo, hi = payload["stars"]
+    items, total_count = client.search_repositories(star_query(payload["query"], lo, hi),
+                                                    payload["page"], payload["per_page"])
+    if payload["page"] == 1 and total_count > SEARCH_MAX_RESULTS:
+        halves = split_star_range(lo, hi)
+        if halves:
+            return [], [("search", dict(payload, stars=list(half))) for half in halves], False
+    truncated = payload["page"] == 1 and total_count > SEARCH_MAX_RESULTS
+    if truncated:
+        logging.error(f"Shard {star_query(payload['query'], lo, hi)} matches {total_count} repos, "
+                      f"only the first {SEARCH_MAX_RESULTS} can be crawled.")
+
+    polled_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    rows = []
+    new_tasks = []
+    for item in items:
+        description = (item.get("description") or "").strip() or None
+        rows.append((
+            item["full_name"],
+            item["stargazers_count"],
+            item["forks_count"],
+            polled_at,
+            _db_time(item.get("created_at")),
+            _db_time(item.get("updated_at")),
+            description,
+        ))
+    if len(items) == payload["per_page"] and payload["page"] * payload["per_page"] < SEARCH_MAX_RESULTS:
+        new_tasks.append(("search", dict(payload, page=payload["page"] + 1)))
+    return rows, new_tasks, truncated
+
+def run_worker(db_path, run_id, worker_id, client, summarize, lease_seconds=LEASE_SECONDS, poll_seconds=1):
+    """
+    Leases and runs tasks for `run_id` until the run has nothing pending or leased.
+    `summarize(readme_text)` turns a README into a one-line description.
+    Returns the number of tasks this worker completed.
+    """
+    conn = connect(db_path)
+    completed = 0
+    try:
+        while True:
+            task = lease_task(conn, run_id, worker_id, lease_seconds)
+            if task is None:
+                if run_finished(conn, run_id):
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            task_id, kind, payload = task
+            try:
+                if kind == "search":
+                    rows, new_tasks, truncated = handle_search(client, payload)
+                    done = complete_task(conn, task_id, worker_id, run_id, rows, new_tasks, truncated)
+                elif kind == "enrich":
+                    readme = client.get_readme(payload["repo_full_name"])
+                    description = summarize(readme) if readme else None
+                    done = update_description(conn, task_id, worker_id, run_id, payload["repo_full_name"], description)
+                else:
+                    raise ValueError(f"Unknown task kind: {kind}")
+                if done:
+                    completed += 1
+                else:
+                    logging.warning(f"{worker_id} lost the lease on task {task_id}, result discarded")
+            except RateLimited as e:
+                # Not the task's fault: hand it back without using up an attempt
+                fail_task(conn, task_id, worker_id, e, retry_in=0, count_attempt=False)
+                if e.installation_id is None:
+                    time.sleep(min(max(0.0, e.reset_at - time.time()), 60))
+            except Exception as e:
+                logging.error(f"{worker_id} failed task {task_id} ({kind}): {e}")
+                fail_task(conn, task_id, worker_id, e)
+    finally:
+        conn.close()
+    logging.info(f"{worker_id} finished run {run_id}, completed {completed} tasks.")
+    return completed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run crawl tasks leased from the shared work queue.")
+    parser.add_argument("--db", default=None, help="defaults to DB_PATH")
+    parser.add_argument("--run-id", required=True)
+    parser.add_argument("--worker-index", type=int, default=0, help="picks this worker's starting installation")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    args = parser.parse_args()
+
+    # core_monitor sets up logging on import. Tag it with the crawl's run id, and give each
+    # worker its own file: a rotating log can't be shared between processes.
+    os.environ.setdefault("RUN_ID", args.run_id)
+    os.environ.setdefault("LOG_PATH", f"repo_tracker.worker-{args.worker_index}.log")
+    from core_monitor import git_integration, summarize_readme_text, DB_PATH, INSTALLATION_ID
+    args.db = args.db or DB_PATH
+
+    # INSTALLATION_IDS=123,456,789 spreads workers over several installations' rate limits
+    installation_ids = [i.strip() for i in os.getenv("INSTALLATION_IDS", INSTALLATION_ID).split(",") if i.strip()]
+
+    def fetch_token(installation_id):
+        token = git_integration.get_access_token(installation_id)
+        return token.token, token.expires_at.timestamp()
+
+    pool = TokenPool(installation_ids, fetch_token, preferred=args.worker_index)
+    run_worker(args.db, args.run_id, args.worker_id, GitHubREST(pool), summarize_readme_text)
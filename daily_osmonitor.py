@@ -12,8 +12,13 @@ from core_monitor import (
     get_db_row_count,
     SEARCH_QUERY,
     sync_df_to_airtable,
-    post_to_basecamp
+    post_to_basecamp,
+    github_client,
+    DB_PATH
 )
+from categorize import categorize_repos, top_by_category
+from owner_index import refresh_owners, classify_repos, fetch_owner_metadata, repo_owners, top_by_segment
+from snapshot_archive import write_snapshot
 
 import logging
 
@@ -67,12 +72,17 @@ def generate_daily_report(
     prev_db_update_time=None, 
     new_db_update_time=None,
     search_terms="",
+    segment=None,
 ):
     """
     Build a Markdown report focusing on top daily growth
     + some extra context at the top.
+    Pass segment="independent" or "big company" to only report on those repos.
     """
 
+    if segment and 'segment' in df.columns:
+        df = df[df['segment'] == segment].copy()
+
     if 'created_at' in df.columns:
         df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce')
     
@@ -131,11 +141,29 @@ and is intended to keep us apprised of the latest and greatest in OS AI projects
 - ⭐ Stars: {repo['stars']:,} 
 - 📈 1-Day Growth: {repo['daily_diff']:,} stars ({repo['daily_pct']:.2f}%)
 - 🎂 Created: {repo_created}
+- 🏷️ Category: {repo.get('category', 'N/A')}
+- 🏢 Owner: {repo['company'] if isinstance(repo.get('company'), str) else repo.get('segment', 'N/A')}
 - 🔍 Description: {repo['description']}
 - 🔗 [Repo Link](https://github.com/{repo['repo_name']})
 
 """
 
+    if 'segment' in df.columns and not segment:
+        for seg, top_repos in top_by_segment(df, 'daily_pct'):
+            report += f"## Top 5 Daily Growth: {seg.title()}\n"
+            for _, repo in top_repos.iterrows():
+                report += (f"- [{repo['repo_name']}](https://github.com/{repo['repo_name']}): "
+                           f"{repo['daily_diff']:+,} stars ({repo['daily_pct']:.2f}%)\n")
+            report += "\n"
+
+    if 'category' in df.columns:
+        report += "## Daily Growth by Category\n"
+        for category, top_repos in top_by_category(df, 'daily_pct'):
+            report += f"\n### {category}\n"
+            for _, repo in top_repos.iterrows():
+                report += (f"- [{repo['repo_name']}](https://github.com/{repo['repo_name']}): "
+                           f"{repo['daily_diff']:+,} stars ({repo['daily_pct']:.2f}%)\n")
+
     return report
 
 if __name__ == "__main__":
@@ -155,6 +183,14 @@ if __name__ == "__main__":
         # 4) Remove rows with missing or empty repo_name
         df = df.dropna(subset=["repo_name"])  # drop rows where repo_name is NaN
         df = df[df["repo_name"].str.strip() != ""]  # drop rows where repo_name is empty string
+
+        # 4b) Tag each repo with a category (cached locally, no API calls)
+        df = categorize_repos(df, DB_PATH)
+
+        # 4c) Split big-company vs independent repos (owner metadata is cached; only new or stale owners are fetched)
+        refresh_owners(DB_PATH, repo_owners(df["repo_name"]).unique(),
+                       lambda login: fetch_owner_metadata(github_client, login))
+        df = classify_repos(df, DB_PATH)
         
         # 5) Possibly do an AI analysis focusing on daily growth
         analysis = generate_daily_analysis(df.nlargest(5, 'daily_pct'))
@@ -170,6 +206,7 @@ if __name__ == "__main__":
         
         # 7) Create a folder in logs/daily/<timestamp>
         timestamp_full = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        run_ts = datetime.utcnow()  # archive partitions are UTC days, like repo_stats
         folder_name = os.path.join("logs", "daily", timestamp_full)
         os.makedirs(folder_name, exist_ok=True)
         
@@ -178,9 +215,8 @@ if __name__ == "__main__":
         with open(md_path, "w") as f:
             f.write(daily_md)
         
-        # 9) (Optional) also store a CSV of the entire snapshot
-        csv_path = os.path.join(folder_name, f"daily_repos_{timestamp_full}.csv")
-        df.to_csv(csv_path, index=False)
+        # 9) Append the entire snapshot to the Parquet archive (logs/archive/date=<day>/)
+        write_snapshot(df, "daily", run_ts)
 
         logging.info(f"Daily report created: {md_path}")
 
@@ -0,0 +1,164 @@
+# log_setup.py
+
+import os
+import sys
+import gzip
+import copy
+import json
+import uuid
+import queue
+import atexit
+import shutil
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_PATH = "repo_tracker.log"
+MAX_LOG_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+MAX_MESSAGE_CHARS = 2000   # longer messages (e.g. whole DataFrame prompts) are cut to this
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Hands records to a background listener, which does all the formatting and I/O.
+
+    The queue never leaves the process, so records are queued as they are instead of
+    being formatted and copied in the caller like QueueHandler does. Only messages
+    longer than max_chars are formatted here, so huge payloads are cut before they are queued.
+    """
+
+    def __init__(self, log_queue, max_chars=MAX_MESSAGE_CHARS):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+
+    def prepare(self, record):
+        if not self.max_chars:
+            return record
+        msg = record.getMessage() if record.args else str(record.msg)
+        if len(msg) <= self.max_chars:
+            return record
+        record = copy.copy(record)
+        record.truncated = len(msg) - self.max_chars
+        record.msg = f"{msg[:self.max_chars]}... [{record.truncated} chars truncated]"
+        record.args = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through only 1 in N records logged with extra={"sample_every": N},
+    counted per call site. Use it for per-repo lines in long loops.
+    setup_logging puts it on the root logger, so dropped records never reach a handler.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counts = {}
+
+    def filter(self, record):
+        every = getattr(record, "sample_every", None)
+        if not every or every <= 1:
+            return True
+        key = (record.pathname, record.lineno)
+        seen = self._counts.get(key, 0)
+        self._counts[key] = seen + 1
+        return seen % every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, tagged with the run ID.
+    """
+
+    def __init__(self, run_id):
+        super().__init__()
+        self.run_id = run_id
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "run_id": self.run_id,
+            "module": record.module,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "truncated", 0):
+            entry["truncated"] = record.truncated
+        if getattr(record, "sample_every", None):
+            entry["sample_every"] = record.sample_every
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class GzipRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that gzips each rotated file (repo_tracker.log.1.gz, ...).
+    """
+
+    def __init__(self, filename, max_bytes=MAX_LOG_BYTES, backups=LOG_BACKUPS):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._gzip_rotate
+
+    @staticmethod
+    def _gzip_rotate(source, dest):
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+
+class LogListener(QueueListener):
+    """
+    QueueListener that remembers the run ID, can be stopped more than once,
+    and closes its handlers when stopped.
+    """
+
+    def __init__(self, log_queue, *handlers, run_id=None):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.run_id = run_id
+
+    def stop(self):
+        if self._thread is None:
+            return
+        super().stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+def setup_logging(run_id=None, log_path=LOG_PATH, level=logging.INFO, max_bytes=MAX_LOG_BYTES,
+                  backups=LOG_BACKUPS, max_chars=MAX_MESSAGE_CHARS, console=True):
+    """
+    Routes the root logger through a queue to a background thread that writes
+    JSON lines to a rotating, gzip-compressed log file (and plain text to stderr).
+    Replaces any handlers already on the root logger. Returns the LogListener;
+    it is stopped (and the queue flushed) at exit.
+    """
+    run_id = run_id or uuid.uuid4().hex[:12]
+
+    file_handler = GzipRotatingFileHandler(log_path, max_bytes, backups)
+    file_handler.setFormatter(JsonFormatter(run_id))
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(f'%(asctime)s - {run_id} - %(levelname)s - %(message)s'))
+        handlers.append(console_handler)
+
+    log_queue = queue.Queue(-1)
+    listener = LogListener(log_queue, *handlers, run_id=run_id)
+    queue_handler = TruncatingQueueHandler(log_queue, max_chars)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    for f in root.filters[:]:
+        if isinstance(f, SamplingFilter):
+            root.removeFilter(f)
+    root.addFilter(SamplingFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    # Neither formatter uses thread or process names; skipping them makes every record cheaper to create
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
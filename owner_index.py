@@ -0,0 +1,187 @@
+# owner_index.py
+
+import ast
+import sqlite3
+from datetime import datetime, timedelta
+import logging
+
+import numpy as np
+import pandas as pd
+
+BIG_COMPANIES_PATH = "bigcompanies.txt"
+OWNER_TTL_DAYS = 7
+BIG_COMPANY = "big company"
+INDEPENDENT = "independent"
+
+# GitHub logins that belong to a company in BIG_COMPANIES but don't match its name.
+# Maps login -> company name as it appears in bigcompanies.txt.
+COMPANY_ALIASES = {
+    "facebookresearch": "facebook",
+    "facebookincubator": "facebook",
+    "meta-llama": "meta",
+    "metaresearch": "meta",
+    "google-research": "google",
+    "googleapis": "google",
+    "google-gemini": "google",
+    "googlecloudplatform": "google",
+    "google-deepmind": "deepmind",
+    "azure": "microsoft",
+    "azure-samples": "microsoft",
+    "microsoftdocs": "microsoft",
+    "awslabs": "aws",
+    "aws-samples": "aws",
+    "amazon-science": "amazon",
+    "nvidia-ai-iot": "nvidia",
+    "nvlabs": "nvidia",
+    "intel-analytics": "intel",
+    "intellabs": "intel",
+    "ibm-granite": "ibm",
+    "apple-research": "apple",
+    "paddlepaddle": "baidu",
+    "bytedance-seed": "bytedance",
+    "alibaba-nlp": "alibaba",
+    "modelscope": "alibaba",
+    "stabilityai": "stability-ai",
+    "xai-org": "xai",
+    "anthropics": "anthropic",
+}
+
+def load_big_companies(path=BIG_COMPANIES_PATH):
+    """
+    Reads the BIG_COMPANIES set literal from bigcompanies.txt (lowercased).
+    """
+    with open(path, "r") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "BIG_COMPANIES" for t in node.targets):
+            return {name.lower() for name in ast.literal_eval(node.value)}
+    raise ValueError(f"No BIG_COMPANIES set found in {path}")
+
+def init_owner_table(db_path):
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS owner_index (
+            owner TEXT PRIMARY KEY,
+            owner_type TEXT,
+            followers INTEGER,
+            is_verified INTEGER,
+            domain TEXT,
+            fetched_at DATETIME
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+def repo_owners(repo_names):
+    """
+    Lowercased owner login for each 'owner/repo' name.
+    """
+    return pd.Series(repo_names).astype(str).str.split("/", n=1).str[0].str.lower()
+
+def _domain(blog):
+    """
+    'https://ai.meta.com/research' -> 'ai.meta.com'
+    """
+    if not blog:
+        return None
+    host = blog.lower().split("://", 1)[-1].split("/", 1)[0].split(":", 1)[0]
+    return host or None
+
+def fetch_owner_metadata(client, login):
+    """
+    Looks up one owner with PyGithub: one call for users, two for organizations.
+    """
+    user = client.get_user(login)
+    metadata = {
+        "owner_type": user.type,
+        "followers": user.followers,
+        "is_verified": False,
+        "domain": _domain(user.blog),
+    }
+    if user.type == "Organization":
+        org = client.get_organization(login)
+        metadata["is_verified"] = bool(org.raw_data.get("is_verified"))
+    return metadata
+
+def stale_owners(db_path, owners, ttl_days=OWNER_TTL_DAYS, now=None):
+    """
+    Owners that are missing from owner_index or were fetched more than ttl_days ago.
+    """
+    now = now or datetime.utcnow()
+    cutoff = (now - timedelta(days=ttl_days)).strftime('%Y-%m-%d %H:%M:%S')
+    conn = sqlite3.connect(db_path)
+    fresh = {row[0] for row in conn.execute("SELECT owner FROM owner_index WHERE fetched_at >= ?", (cutoff,))}
+    conn.close()
+    return sorted(set(owners) - fresh)
+
+def refresh_owners(db_path, owners, fetch_owner, ttl_days=OWNER_TTL_DAYS, now=None):
+    """
+    Fetches metadata only for owners that are missing or past their TTL and stores it.
+    `fetch_owner(login)` returns a dict like fetch_owner_metadata. Returns how many were fetched.
+    """
+    init_owner_table(db_path)
+    now = now or datetime.utcnow()
+    fetched_at = now.strftime('%Y-%m-%d %H:%M:%S')
+    rows = []
+    for login in stale_owners(db_path, owners, ttl_days, now):
+        try:
+            m = fetch_owner(login)
+        except Exception as e:
+            logging.error(f"Error fetching owner {login}: {e}")
+            continue
+        rows.append((login, m["owner_type"], m["followers"], int(bool(m["is_verified"])), m["domain"], fetched_at))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT OR REPLACE INTO owner_index (owner, owner_type, followers, is_verified, domain, fetched_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+    logging.info(f"Refreshed metadata for {len(rows)} owners.")
+    return len(rows)
+
+def classify_repos(df, db_path, big_companies=None, aliases=None):
+    """
+    Adds owner, owner_type, owner_followers, company and segment ('big company' or
+    'independent') columns to the snapshot with one join against owner_index.
+
+    An owner counts as a big company if its login, or the company its login is an
+    alias of, is in BIG_COMPANIES, or if it is a verified org with any label of its
+    domain in BIG_COMPANIES (ai.meta.com -> meta, research.google -> google,
+    lab.nvidia.co.uk -> nvidia). Makes no API calls.
+    """
+    init_owner_table(db_path)
+    big = pd.Index(sorted(load_big_companies() if big_companies is None else {b.lower() for b in big_companies}))
+    alias_map = {**COMPANY_ALIASES, **(aliases or {})}
+
+    conn = sqlite3.connect(db_path)
+    index = pd.read_sql_query("SELECT owner, owner_type, followers, is_verified, domain FROM owner_index", conn)
+    conn.close()
+
+    owners = repo_owners(df["repo_name"]).to_numpy()
+    joined = pd.DataFrame({"owner": owners}).merge(index, on="owner", how="left")
+
+    canonical = joined["owner"].map(alias_map).fillna(joined["owner"])
+    labels = joined["domain"].str.split(".").explode()
+    domain_name = labels[labels.isin(big)].groupby(level=0).first().reindex(joined.index)
+    verified = joined["is_verified"].fillna(0).astype(bool)
+
+    by_login = canonical.isin(big)
+    by_domain = verified & domain_name.notna()
+    company = canonical.where(by_login, domain_name.where(by_domain))
+
+    df = df.copy()
+    df["owner"] = owners
+    df["owner_type"] = joined["owner_type"].to_numpy()
+    df["owner_followers"] = joined["followers"].to_numpy()
+    df["company"] = company.to_numpy()
+    df["segment"] = np.where(by_login | by_domain, BIG_COMPANY, INDEPENDENT)
+    return df
+
+def top_by_segment(df, column, n=5):
+    """
+    Returns [(segment, top-n rows by `column`)] for independent and big-company repos.
+    """
+    return [(segment, df[df["segment"] == segment].nlargest(n, column)) for segment in (INDEPENDENT, BIG_COMPANY)]
@@ -0,0 +1,273 @@
+# poll_scheduler.py
+
+import heapq
+import time
+import logging
+
+MIN_POLL_INTERVAL = 15 * 60          # never poll a repo more than every 15 minutes
+MAX_POLL_INTERVAL = 24 * 60 * 60     # dormant repos still get polled once a day
+STARS_PER_POLL = 25                  # aim to see roughly this many new stars between polls
+POLL_BUDGET_PER_HOUR = 4000          # GitHub App limit is 5000/h, keep headroom for searches
+
+
+class PollScheduler:
+    """
+    Priority queue of repos ordered by next-due time.
+
+    Each repo's polling interval is derived from its recent star velocity
+    (stars/hour, smoothed): the faster it grows, the more often it is polled,
+    clamped to [min_interval, max_interval]. If the sum of all repos' polling
+    rates exceeds budget_per_hour, every interval is stretched by the same
+    factor; when that factor changes, the due times of all queued repos are
+    recomputed before the queue is next read. A token bucket enforces the
+    budget on the actual polls handed out.
+
+    `clock` is any zero-arg callable returning seconds, so tests can pass a fake.
+    """
+
+    def __init__(
+        self,
+        clock=time.time,
+        min_interval=MIN_POLL_INTERVAL,
+        max_interval=MAX_POLL_INTERVAL,
+        stars_per_poll=STARS_PER_POLL,
+        budget_per_hour=POLL_BUDGET_PER_HOUR,
+        smoothing=0.5,
+    ):
+        self.clock = clock
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.stars_per_poll = stars_per_poll
+        self.budget_per_hour = budget_per_hour
+        self.smoothing = smoothing
+
+        self._heap = []    # (due, seq, repo_full_name); stale entries are skipped lazily
+        self._seq = 0
+        self._repos = {}   # repo_full_name -> {"stars", "polled_at", "velocity", "interval", "retry_at", "due"}
+        self._demand = 0.0  # polls/hour requested by all repos at their raw intervals
+        self._heap_scale = 1.0  # budget_scale() the queued due times were computed with
+
+        self._capacity = max(1.0, budget_per_hour / 60.0)  # at most a minute's worth of burst
+        self._tokens = self._capacity
+        self._refilled_at = clock()
+
+    def __len__(self):
+        return len(self._repos)
+
+    def __contains__(self, repo_full_name):
+        return repo_full_name in self._repos
+
+    def interval_for(self, velocity):
+        """
+        Raw polling interval (seconds) for a star velocity in stars/hour.
+        """
+        if velocity <= 0:
+            return self.max_interval
+        interval = self.stars_per_poll / velocity * 3600
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def budget_scale(self):
+        """
+        Factor (>= 1) applied to every interval so total demand fits the budget.
+        """
+        if self._demand <= self.budget_per_hour:
+            return 1.0
+        return self._demand / self.budget_per_hour
+
+    def add_repo(self, repo_full_name, stars, polled_at=None, velocity=0.0):
+        """
+        Starts tracking a repo. `velocity` seeds the rate (e.g. from the last day of history).
+        Re-adding a tracked repo is a no-op.
+        """
+        if repo_full_name in self._repos:
+            return
+        polled_at = self.clock() if polled_at is None else polled_at
+        self._repos[repo_full_name] = {
+            "stars": stars,
+            "polled_at": polled_at,
+            "velocity": max(0.0, velocity),
+            "interval": None,
+            "retry_at": None,
+            "due": None,
+        }
+        self._reschedule(repo_full_name, polled_at)
+
+    def record_poll(self, repo_full_name, stars, polled_at=None):
+        """
+        Updates the repo's velocity from a fresh star count and schedules its next poll.
+        Returns the effective interval in seconds.
+        """
+        polled_at = self.clock() if polled_at is None else polled_at
+        state = self._repos[repo_full_name]
+        elapsed_hours = (polled_at - state["polled_at"]) / 3600
+        if elapsed_hours > 0:
+            instant = max(0.0, (stars - state["stars"]) / elapsed_hours)
+            state["velocity"] = self.smoothing * instant + (1 - self.smoothing) * state["velocity"]
+        state["stars"] = stars
+        state["polled_at"] = polled_at
+        return self._reschedule(repo_full_name, polled_at)
+
+    def record_failure(self, repo_full_name):
+        """
+        Puts a repo whose poll failed back in the queue after the minimum interval.
+        """
+        state = self._repos[repo_full_name]
+        state["retry_at"] = state["due"] = self.clock() + self.min_interval
+        self._push(state["due"], repo_full_name)
+
+    def remove_repo(self, repo_full_name):
+        state = self._repos.pop(repo_full_name, None)
+        if state and state["interval"]:
+            self._demand -= 3600 / state["interval"]
+
+    def retain(self, repo_full_names):
+        """
+        Stops tracking every repo not in `repo_full_names` (e.g. after a reseed, repos
+        that dropped out of the search results), so they stop counting against the budget.
+        Returns the removed repos.
+        """
+        keep = set(repo_full_names)
+        removed = [name for name in self._repos if name not in keep]
+        for name in removed:
+            self.remove_repo(name)
+        return removed
+
+    def velocity(self, repo_full_name):
+        return self._repos[repo_full_name]["velocity"]
+
+    def next_due(self, repo_full_name):
+        self._apply_budget_scale()
+        return self._repos[repo_full_name]["due"]
+
+    def pop_due(self, limit=None):
+        """
+        Returns repos whose next poll is due, as many as the rate budget allows.
+        Returned repos leave the queue until record_poll/record_failure is called.
+        """
+        self._apply_budget_scale()
+        now = self.clock()
+        self._refill(now)
+        due = []
+        while self._heap and self._tokens >= 1:
+            if limit is not None and len(due) >= limit:
+                break
+            when, _, repo_full_name = self._heap[0]
+            if self._is_stale(when, repo_full_name):
+                heapq.heappop(self._heap)
+                continue
+            if when > now:
+                break
+            heapq.heappop(self._heap)
+            self._repos[repo_full_name]["due"] = None
+            self._tokens -= 1
+            due.append(repo_full_name)
+        return due
+
+    def seconds_until_next(self):
+        """
+        How long the caller can sleep before pop_due can return something.
+        Returns None when nothing is queued.
+        """
+        self._apply_budget_scale()
+        while self._heap and self._is_stale(self._heap[0][0], self._heap[0][2]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        now = self.clock()
+        self._refill(now)
+        wait = max(0.0, self._heap[0][0] - now)
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / (self.budget_per_hour / 3600))
+        return wait
+
+    def _reschedule(self, repo_full_name, polled_at):
+        state = self._repos[repo_full_name]
+        if state["interval"]:
+            self._demand -= 3600 / state["interval"]
+        state["interval"] = self.interval_for(state["velocity"])
+        self._demand += 3600 / state["interval"]
+        state["retry_at"] = None
+        effective = state["interval"] * self.budget_scale()
+        state["due"] = polled_at + effective
+        self._push(state["due"], repo_full_name)
+        return effective
+
+    def _apply_budget_scale(self):
+        """
+        If the budget scale moved since the queue was built (repos added, removed or
+        re-rated), recomputes every queued repo's due time with the current scale,
+        so all intervals are stretched by the same factor. Failure retries keep their time.
+        """
+        scale = self.budget_scale()
+        if scale == self._heap_scale:
+            return
+        self._heap = []
+        for repo_full_name, state in self._repos.items():
+            if state["due"] is None:
+                continue
+            if state["retry_at"] is None:
+                state["due"] = state["polled_at"] + state["interval"] * scale
+            self._seq += 1
+            self._heap.append((state["due"], self._seq, repo_full_name))
+        heapq.heapify(self._heap)
+        self._heap_scale = scale
+
+    def _push(self, due, repo_full_name):
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, repo_full_name))
+
+    def _is_stale(self, when, repo_full_name):
+        state = self._repos.get(repo_full_name)
+        return state is None or state["due"] != when
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self._refilled_at)
+        self._tokens = min(self._capacity, self._tokens + elapsed * self.budget_per_hour / 3600)
+        self._refilled_at = now
+
+
+class WriteBuffer:
+    """
+    Collects rows and hands them to `flush_fn` in batches, either when
+    `batch_size` rows are waiting or the oldest row is `max_age` seconds old.
+    """
+
+    def __init__(self, flush_fn, batch_size=100, max_age=60, clock=time.time):
+        self.flush_fn = flush_fn
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.clock = clock
+        self._rows = []
+        self._oldest = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, row):
+        if not self._rows:
+            self._oldest = self.clock()
+        self._rows.append(row)
+        return self.maybe_flush()
+
+    def maybe_flush(self):
+        if not self._rows:
+            return 0
+        if len(self._rows) >= self.batch_size or self.clock() - self._oldest >= self.max_age:
+            return self.flush()
+        return 0
+
+    def flush(self):
+        """
+        Writes all waiting rows. If `flush_fn` raises (e.g. database is locked),
+        the rows are kept for the next attempt and 0 is returned.
+        """
+        if not self._rows:
+            return 0
+        try:
+            self.flush_fn(self._rows)
+        except Exception as e:
+            logging.error(f"Error writing {len(self._rows)} buffered rows, will retry: {e}")
+            return 0
+        written = len(self._rows)
+        self._rows, self._oldest = [], None
+        return written
@@ -0,0 +1,148 @@
+# repo_snapshot.py
+
+import sys
+import time
+from array import array
+from datetime import timezone
+
+import numpy as np
+import pandas as pd
+
+DB_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+MISSING_TIME = np.iinfo(np.int64).min   # stands for a missing timestamp; same bits as datetime64 NaT
+
+def _epoch(dt):
+    """
+    Seconds since epoch for a PyGithub datetime (naive values are UTC), MISSING_TIME for None.
+    """
+    if dt is None:
+        return MISSING_TIME
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+def _db_time(epoch_seconds):
+    if epoch_seconds == MISSING_TIME:
+        return None
+    return time.strftime(DB_TIME_FORMAT, time.gmtime(epoch_seconds))
+
+
+class RepoSnapshot:
+    """
+    One repo's stats at one point in time. Timestamps are UTC epoch seconds,
+    so nothing here holds on to PyGithub objects or datetimes.
+    """
+
+    __slots__ = ("repo_name", "stars", "forks", "created_at", "updated_at", "polled_at", "description")
+
+    def __init__(self, repo_name, stars, forks, created_at, updated_at, polled_at, description):
+        self.repo_name = sys.intern(repo_name)
+        self.stars = stars
+        self.forks = forks
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.polled_at = polled_at
+        self.description = description
+
+    @classmethod
+    def from_github(cls, repo, description, polled_at=None):
+        return cls(
+            repo.full_name,
+            repo.stargazers_count,
+            repo.forks_count,
+            _epoch(repo.created_at),
+            _epoch(repo.updated_at),
+            int(time.time()) if polled_at is None else int(polled_at),
+            description,
+        )
+
+    def db_row(self):
+        """
+        Values for INSERT INTO repo_stats (repo_full_name, star_count, forks_count, timestamp, created_at, updated_at, description).
+        """
+        return (
+            self.repo_name,
+            self.stars,
+            self.forks,
+            _db_time(self.polled_at),
+            _db_time(self.created_at),
+            _db_time(self.updated_at),
+            self.description,
+        )
+
+
+class RepoSnapshotBatch:
+    """
+    Column store for one crawl: snapshots plus their star diffs, held in typed
+    arrays instead of one dict per repo. to_frame() wraps the arrays without copying them row by row.
+    """
+
+    _INT_COLUMNS = ("stars", "forks", "created_at", "updated_at", "polled_at", "daily_diff", "weekly_diff")
+    _FLOAT_COLUMNS = ("daily_pct", "weekly_pct")
+
+    def __init__(self):
+        self.repo_names = []
+        self.descriptions = []
+        for name in self._INT_COLUMNS:
+            setattr(self, name, array('q'))
+        for name in self._FLOAT_COLUMNS:
+            setattr(self, name, array('d'))
+
+    def __len__(self):
+        return len(self.repo_names)
+
+    def append(self, snapshot, daily_diff=0, daily_pct=0.0, weekly_diff=0, weekly_pct=0.0):
+        self.repo_names.append(snapshot.repo_name)
+        self.descriptions.append(snapshot.description)
+        self.stars.append(snapshot.stars)
+        self.forks.append(snapshot.forks)
+        self.created_at.append(snapshot.created_at)
+        self.updated_at.append(snapshot.updated_at)
+        self.polled_at.append(snapshot.polled_at)
+        self.daily_diff.append(daily_diff)
+        self.daily_pct.append(daily_pct)
+        self.weekly_diff.append(weekly_diff)
+        self.weekly_pct.append(weekly_pct)
+
+    def db_rows(self, start=0):
+        """
+        Yields repo_stats rows (see RepoSnapshot.db_row) without building snapshot objects,
+        from index `start` on (e.g. only the rows not stored yet).
+        """
+        for i in range(start, len(self)):
+            yield (
+                self.repo_names[i],
+                self.stars[i],
+                self.forks[i],
+                _db_time(self.polled_at[i]),
+                _db_time(self.created_at[i]),
+                _db_time(self.updated_at[i]),
+                self.descriptions[i],
+            )
+
+    def to_frame(self):
+        """
+        DataFrame with the columns run_repo_tracking has always returned.
+        """
+        def ints(name):
+            return np.frombuffer(getattr(self, name), dtype=np.int64)
+
+        def floats(name):
+            return np.frombuffer(getattr(self, name), dtype=np.float64)
+
+        def times(name):
+            return ints(name).astype("datetime64[s]")   # MISSING_TIME becomes NaT
+
+        if not len(self):
+            return pd.DataFrame()
+        return pd.DataFrame({
+            "repo_name": self.repo_names,
+            "stars": ints("stars"),
+            "daily_diff": ints("daily_diff"),
+            "daily_pct": floats("daily_pct"),
+            "weekly_diff": ints("weekly_diff"),
+            "weekly_pct": floats("weekly_pct"),
+            "created_at": times("created_at"),
+            "updated_at": times("updated_at"),
+            "description": self.descriptions,
+        })
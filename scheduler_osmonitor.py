@@ -0,0 +1,102 @@
+# scheduler_osmonitor.py
+
+import time
+import logging
+
+from core_monitor import (
+    init_database,
+    get_github_client,
+    summarize_readme_if_needed,
+    compute_star_diff,
+    store_repo_data_batch,
+    iter_search_results,
+    SEARCH_QUERY,
+    MAX_REPOS,
+)
+from poll_scheduler import PollScheduler, WriteBuffer
+from repo_snapshot import RepoSnapshot
+
+TOKEN_REFRESH_SECONDS = 50 * 60   # installation tokens expire after an hour
+RESEED_SECONDS = 24 * 60 * 60     # re-run the search once a day to pick up new repos
+MAX_SLEEP_SECONDS = 60
+
+def seed_scheduler(scheduler, client, buffer, descriptions):
+    """
+    Runs the search query and adds every result to the scheduler, seeding its
+    velocity from the last day of history. Repos no longer in the results are dropped.
+    The search results are stored as a snapshot too.
+    """
+    results = client.search_repositories(query=SEARCH_QUERY, sort='stars', order='desc')
+    added = 0
+    found = set()
+    for count, repo in enumerate(iter_search_results(results)):
+        if MAX_REPOS and count >= MAX_REPOS:
+            break
+        found.add(repo.full_name)
+        if repo.full_name in scheduler:
+            continue
+        daily_diff, _, _, _ = compute_star_diff(repo.full_name, repo.stargazers_count)
+        scheduler.add_repo(repo.full_name, repo.stargazers_count, velocity=daily_diff / 24)
+        descriptions[repo.full_name] = summarize_readme_if_needed(repo)
+        buffer.add(RepoSnapshot.from_github(repo, descriptions[repo.full_name]).db_row())
+        added += 1
+    removed = scheduler.retain(found)
+    for repo_full_name in removed:
+        descriptions.pop(repo_full_name, None)
+    logging.info(f"Seeded {added} new repos, dropped {len(removed)}, now tracking {len(scheduler)}.")
+
+def poll_due_repos(scheduler, client, buffer, descriptions):
+    """
+    Polls every repo the scheduler says is due and buffers the new snapshots.
+    """
+    polled = 0
+    for repo_full_name in scheduler.pop_due():
+        try:
+            repo = client.get_repo(repo_full_name)
+        except Exception as e:
+            logging.error(f"Error polling {repo_full_name}: {e}")
+            scheduler.record_failure(repo_full_name)
+            continue
+        interval = scheduler.record_poll(repo_full_name, repo.stargazers_count)
+        logging.debug(f"Polled {repo_full_name}: {repo.stargazers_count} stars, next in {interval / 60:.0f} min")
+        buffer.add(RepoSnapshot.from_github(repo, descriptions.get(repo_full_name) or repo.description).db_row())
+        polled += 1
+    return polled
+
+def run_scheduler():
+    init_database()
+    scheduler = PollScheduler()
+    buffer = WriteBuffer(store_repo_data_batch)
+    descriptions = {}
+
+    client = get_github_client()
+    client_created = time.time()
+    last_seed = None
+
+    try:
+        while True:
+            now = time.time()
+            if now - client_created >= TOKEN_REFRESH_SECONDS:
+                client = get_github_client()
+                client_created = now
+            if last_seed is None or now - last_seed >= RESEED_SECONDS:
+                seed_scheduler(scheduler, client, buffer, descriptions)
+                last_seed = now
+
+            polled = poll_due_repos(scheduler, client, buffer, descriptions)
+            if polled:
+                logging.info(f"Polled {polled} repos, {len(buffer)} rows waiting to be written.")
+            buffer.maybe_flush()
+
+            wait = scheduler.seconds_until_next()
+            time.sleep(min(wait if wait is not None else MAX_SLEEP_SECONDS, MAX_SLEEP_SECONDS))
+    finally:
+        buffer.flush()
+
+if __name__ == "__main__":
+    try:
+        run_scheduler()
+    except KeyboardInterrupt:
+        logging.info("Scheduler stopped.")
+    except Exception as e:
+        logging.error(f"Error in scheduler: {e}")
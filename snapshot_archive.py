@@ -0,0 +1,130 @@
+# snapshot_archive.py
+
+import os
+import glob
+from datetime import datetime, timezone
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+ARCHIVE_ROOT = os.path.join("logs", "archive")
+
+# One row per repo per run. The dataset is hive-partitioned by date=YYYY-MM-DD,
+# and repo_name/run_kind are dictionary-encoded since they repeat across runs.
+ARCHIVE_SCHEMA = pa.schema([
+    ("run_ts", pa.timestamp("s")),
+    ("run_kind", pa.dictionary(pa.int8(), pa.string())),
+    ("repo_name", pa.dictionary(pa.int32(), pa.string())),
+    ("stars", pa.int64()),
+    ("daily_diff", pa.int64()),
+    ("daily_pct", pa.float64()),
+    ("weekly_diff", pa.int64()),
+    ("weekly_pct", pa.float64()),
+    ("created_at", pa.timestamp("s")),
+    ("updated_at", pa.timestamp("s")),
+    ("description", pa.string()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+def _to_naive_utc(series):
+    return pd.to_datetime(series, errors="coerce", utc=True).dt.tz_convert(None)
+
+def snapshot_to_table(df, run_kind, run_ts):
+    """
+    Converts a run_repo_tracking DataFrame into an Arrow table matching ARCHIVE_SCHEMA.
+    Columns the DataFrame doesn't have are stored as nulls; extra columns are dropped.
+    """
+    n = len(df)
+    frame = pd.DataFrame({
+        "run_ts": pd.Series([run_ts] * n, dtype="datetime64[s]"),
+        "run_kind": [run_kind] * n,
+    })
+    for field in ARCHIVE_SCHEMA:
+        if field.name in frame.columns:
+            continue
+        if field.name not in df.columns:
+            frame[field.name] = None
+        elif pa.types.is_timestamp(field.type):
+            frame[field.name] = _to_naive_utc(df[field.name]).to_numpy()
+        else:
+            frame[field.name] = df[field.name].to_numpy()
+    table = pa.Table.from_pandas(frame, schema=ARCHIVE_SCHEMA, preserve_index=False, safe=False)
+    return table.append_column("date", pa.array([run_ts.strftime("%Y-%m-%d")] * n, pa.string()))
+
+def write_snapshot(df, run_kind, run_ts=None, root=ARCHIVE_ROOT):
+    """
+    Appends one run to the archive. Re-writing the same (run_kind, run_ts) replaces that run's file.
+    """
+    run_ts = (run_ts or datetime.utcnow()).replace(microsecond=0)
+    table = snapshot_to_table(df, run_kind, run_ts)
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"{run_kind}_{run_ts.strftime('%Y-%m-%d_%H-%M-%S')}_{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    logging.info(f"Archived {len(df)} {run_kind} rows to {root}")
+
+def read_snapshots(start=None, end=None, columns=None, filter=None, root=ARCHIVE_ROOT):
+    """
+    Loads archived runs between start and end (inclusive dates or datetimes, UTC) as a DataFrame.
+    A date bound covers the whole day; a bound with a time of day also filters on run_ts.
+
+    Only the partitions in range are opened and only `columns` are read.
+    `filter` is an optional pyarrow.dataset expression pushed down to the
+    Parquet reader, e.g. ds.field("run_kind") == "daily".
+    """
+    if not os.path.isdir(root):
+        return pd.DataFrame(columns=columns or ARCHIVE_SCHEMA.names)
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+    expr = filter
+    if start is not None:
+        start = _utc_bound(start)
+        expr = _and(expr, ds.field("date") >= start.strftime("%Y-%m-%d"))
+        if start != start.normalize():
+            expr = _and(expr, ds.field("run_ts") >= pa.scalar(start.to_pydatetime(), pa.timestamp("s")))
+    if end is not None:
+        end = _utc_bound(end)
+        expr = _and(expr, ds.field("date") <= end.strftime("%Y-%m-%d"))
+        if end != end.normalize():
+            expr = _and(expr, ds.field("run_ts") <= pa.scalar(end.to_pydatetime(), pa.timestamp("s")))
+
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+def _utc_bound(value):
+    ts = pd.Timestamp(value)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo else ts
+
+def _and(left, right):
+    return right if left is None else left & right
+
+def import_csv_logs(logs_root="logs", root=ARCHIVE_ROOT):
+    """
+    One-time import of the per-run CSVs under logs/daily/<ts>/ and logs/weekly/<ts>/.
+    Folder names are local time; they are converted to UTC like live runs' run_ts.
+    Safe to re-run: each run maps to the same archive file.
+    """
+    imported = 0
+    for run_kind in ("daily", "weekly"):
+        pattern = os.path.join(logs_root, run_kind, "*", f"{run_kind}_repos_*.csv")
+        for csv_path in sorted(glob.glob(pattern)):
+            folder = os.path.basename(os.path.dirname(csv_path))
+            try:
+                local_ts = datetime.strptime(folder, "%Y-%m-%d_%H-%M-%S")
+            except ValueError:
+                logging.error(f"Skipping {csv_path}: unrecognized run folder name")
+                continue
+            run_ts = local_ts.astimezone(timezone.utc).replace(tzinfo=None)
+            write_snapshot(pd.read_csv(csv_path), run_kind, run_ts, root=root)
+            imported += 1
+    logging.info(f"Imported {imported} CSV snapshots into {root}")
+    return imported
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    import_csv_logs()
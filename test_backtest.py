@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+
+from backtest import load_history, forward_fill, top_k_members, rank_stability, find_breakouts, run_backtest, leaderboard
+
+def test_load_history_builds_day_matrix():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "repos.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE repo_stats (repo_full_name TEXT, star_count INTEGER, timestamp DATETIME)")
+        conn.executemany("INSERT INTO repo_stats VALUES (?, ?, ?)", [
+            ("hot-repo/viral", 1000, "2025-01-20 09:00:00"),
+            ("hot-repo/viral", 1100, "2025-01-20 18:00:00"),  # last reading of the day wins
+            ("hot-repo/viral", 1300, "2025-01-23 09:00:00"),
+            ("slow/repo", 10000, "2025-01-21 09:00:00"),
+        ])
+        conn.commit()
+        conn.close()
+
+        days, repos, stars = load_history(db_path)
+        assert [str(d) for d in days] == ["2025-01-20", "2025-01-21", "2025-01-22", "2025-01-23"]
+        assert list(repos) == ["hot-repo/viral", "slow/repo"]
+        np.testing.assert_array_equal(stars[:, 0], [1100, 1100, 1100, 1300])
+        np.testing.assert_array_equal(stars[:, 1], [np.nan, 10000, 10000, 10000])
+
+def test_forward_fill():
+    m = np.array([[np.nan, 1.0], [2.0, np.nan], [np.nan, np.nan]])
+    np.testing.assert_array_equal(forward_fill(m), [[np.nan, 1], [2, 1], [2, 1]])
+
+def test_top_k_and_stability():
+    scores = np.array([
+        [3.0, 2.0, 1.0, np.nan],
+        [1.0, 2.0, 3.0, np.nan],
+        [np.nan, np.nan, np.nan, 5.0],
+    ])
+    members = top_k_members(scores, k=2)
+    np.testing.assert_array_equal(members, [
+        [True, True, False, False],
+        [False, True, True, False],
+        [False, False, False, True],
+    ])
+    assert rank_stability(members) == (1 / 3 + 0) / 2
+    assert leaderboard(scores, np.array(["a", "b", "c", "d"]), day=1, k=2) == [("c", 3.0), ("b", 2.0)]
+
+def test_breakout_detection():
+    days = 60
+    steady = np.full(days, 200000.0) + np.arange(days) * 500  # big absolute gains, never +50%
+    rocket = np.full(days, 600.0)
+    rocket[20:] = 600 * 1.06 ** np.arange(1, days - 19)       # starts growing fast on day 20
+    flat = np.full(days, 800.0)
+    stars = np.column_stack([steady, rocket, flat])
+
+    breakout_day = find_breakouts(stars, pct=50, window=30, min_stars=500)
+    assert breakout_day[0] == -1 and breakout_day[2] == -1
+    assert 20 < breakout_day[1] < 40
+
+    report = run_backtest(stars, k=1, pct=50, window=30, min_stars=500)
+    assert report.loc["daily_pct", "detected"] == 1
+    assert report.loc["daily_pct", "median_lead_days"] > 0   # % growth catches it before it breaks out
+    assert report.loc["daily_diff", "detected"] == 0         # absolute diff keeps ranking the big repo
+    assert report.loc["daily_diff", "stability"] == 1.0
+
+if __name__ == "__main__":
+    test_load_history_builds_day_matrix()
+    test_forward_fill()
+    test_top_k_and_stability()
+    test_breakout_detection()
+    print("All backtest tests passed.")
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import tempfile
+
+import pandas as pd
+
+from categorize import categorize_repos, top_by_category, OTHER_CATEGORY
+
+def make_snapshot():
+    return pd.DataFrame({
+        "repo_name": [
+            "crewAIInc/crewAI",
+            "openai/whisper",
+            "vllm-project/vllm",
+            "continuedev/continue",
+            "someone/misc",
+        ],
+        "description": [
+            "Framework for orchestrating role-playing, autonomous AI agents",
+            "Robust speech recognition via large-scale weak supervision",
+            "A high-throughput and memory-efficient inference and serving engine for LLMs",
+            "Open-source AI code assistant for VS Code and JetBrains IDE",
+            None,
+        ],
+        "daily_pct": [5.0, 1.0, 2.0, 3.0, 0.5],
+    })
+
+def test_categorize_and_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "repos.db")
+        df = categorize_repos(make_snapshot(), db_path, n_clusters=2)
+        assert df["category"].tolist() == ["Agents", "Audio Models", "Infrastructure", "Devtools", OTHER_CATEGORY]
+        assert df["cluster"].between(0, 1).all()
+
+        conn = sqlite3.connect(db_path)
+        before = dict(conn.execute("SELECT repo_full_name, updated_at FROM repo_categories").fetchall())
+        conn.execute("UPDATE repo_categories SET updated_at = 'cached'")
+        conn.commit()
+
+        changed = make_snapshot()
+        changed.loc[4, "description"] = "Text-to-speech voice cloning"
+        df = categorize_repos(changed, db_path, n_clusters=2)
+        assert df["category"].iloc[4] == "Audio Models"
+
+        after = dict(conn.execute("SELECT repo_full_name, updated_at FROM repo_categories").fetchall())
+        conn.close()
+        assert set(before) == set(after)
+        assert [name for name, ts in after.items() if ts != "cached"] == ["someone/misc"]
+
+def make_two_groups():
+    return pd.DataFrame({
+        "repo_name": [f"agents/agent-{i}" for i in range(4)] + [f"speech/speech-{i}" for i in range(4)],
+        "description": [f"autonomous agent framework for tool use {w}" for w in "abcd"]
+                       + [f"speech recognition and text to speech audio {w}" for w in "abcd"],
+    })
+
+def test_cluster_ids_stable_across_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "repos.db")
+        first = categorize_repos(make_two_groups(), db_path, n_clusters=2)
+        assert first["cluster"].nunique() == 2
+
+        # Same repos in reverse order. Fitted from scratch this swaps the two IDs;
+        # seeded from the stored centroids it keeps them.
+        reversed_df = make_two_groups().iloc[::-1].reset_index(drop=True)
+        second = categorize_repos(reversed_df, db_path, n_clusters=2)
+        assert dict(zip(second["repo_name"], second["cluster"])) == dict(zip(first["repo_name"], first["cluster"]))
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM cluster_centroids").fetchone()[0] == 2
+        conn.close()
+
+def test_top_by_category():
+    df = make_snapshot()
+    df["category"] = ["Agents", "Agents", "Devtools", "Agents", OTHER_CATEGORY]
+    sections = top_by_category(df, "daily_pct", n=2)
+    assert [c for c, _ in sections] == ["Agents", "Devtools", OTHER_CATEGORY]
+    assert sections[0][1]["repo_name"].tolist() == ["crewAIInc/crewAI", "continuedev/continue"]
+
+if __name__ == "__main__":
+    test_categorize_and_cache()
+    test_cluster_ids_stable_across_runs()
+    test_top_by_category()
+    print("All categorization tests passed.")
@@ -0,0 +1,297 @@
+import os
+import re
+import json
+import sqlite3
+import tempfile
+import threading
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import crawl_coordinator
+from crawl_coordinator import (
+    connect,
+    init_work_queue,
+    enqueue_tasks,
+    lease_task,
+    complete_task,
+    fail_task,
+    queue_counts,
+    shard_query,
+    split_star_range,
+    plan_crawl,
+    merge_results,
+    wait_for_run,
+    spawn_local_workers,
+)
+from crawl_worker import TokenPool, GitHubREST, RateLimited, run_worker, handle_search
+
+RUN_ID = "test-run"
+
+# ---- fake GitHub ----
+
+FAKE_REPOS = [
+    {
+        "full_name": f"owner{i % 5}/repo-{i}",
+        "stargazers_count": 500 + i * 10,
+        "forks_count": i,
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2025-01-27T10:44:02Z",
+        "description": None if i % 4 == 0 else f"Repo number {i}",
+    }
+    for i in range(120)
+]
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    requests_by_token = {}
+    rate_limited_tokens = set()
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        for k, v in headers:
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        token = self.headers["Authorization"].split()[-1]
+        with self.lock:
+            self.requests_by_token[token] = self.requests_by_token.get(token, 0) + 1
+            if token in self.rate_limited_tokens:
+                self.rate_limited_tokens.discard(token)
+                return self._send(403, "{}", [("X-RateLimit-Remaining", "0"), ("X-RateLimit-Reset", "0")])
+
+        url = urlparse(self.path)
+        if url.path == "/search/repositories":
+            params = parse_qs(url.query)
+            lo, hi = re.search(r"stars:(\d+)\.\.(\d+)", params["q"][0]).groups()
+            page, per_page = int(params["page"][0]), int(params["per_page"][0])
+            matches = [r for r in FAKE_REPOS if int(lo) <= r["stargazers_count"] <= int(hi)]
+            matches.sort(key=lambda r: -r["stargazers_count"])
+            items = matches[(page - 1) * per_page:page * per_page]
+            return self._send(200, json.dumps({"total_count": len(matches), "items": items}))
+
+        match = re.fullmatch(r"/repos/(.+)/readme", url.path)
+        if match:
+            return self._send(200, f"# {match.group(1)}\nGenerated README for {match.group(1)}")
+        self._send(404, "{}")
+
+def start_fake_github():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def fake_fetch_token(installation_id):
+    return f"token-{installation_id}", 2 ** 40
+
+def first_readme_line(readme):
+    return readme.splitlines()[1]
+
+def worker_process(db_path, worker_index, api_url):
+    pool = TokenPool(["inst-1", "inst-2", "inst-3"], fake_fetch_token, preferred=worker_index)
+    run_worker(db_path, RUN_ID, f"worker-{worker_index}", GitHubREST(pool, api_url), first_readme_line,
+               poll_seconds=0.05)
+
+def make_db(tmp):
+    db_path = os.path.join(tmp, "repos.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE repo_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            repo_full_name TEXT,
+            star_count INTEGER,
+            forks_count INTEGER,
+            timestamp DATETIME,
+            created_at DATETIME,
+            updated_at DATETIME,
+            description TEXT
+        )
+    """)
+    conn.commit()
+    conn.close()
+    init_work_queue(db_path)
+    return db_path
+
+# ---- tests ----
+
+def test_shard_query():
+    assert shard_query("llm in:name stars:>500", [(500, 999), (1000, None)]) == [
+        "llm in:name stars:500..999",
+        "llm in:name stars:>=1000",
+    ]
+
+def test_split_star_range():
+    assert split_star_range(501, 700) == [(501, 600), (601, 700)]
+    assert split_star_range(10001, None) == [(10001, 20001), (20002, None)]
+    assert split_star_range(600, 600) is None
+
+class FakeSearch:
+    def __init__(self, total_count, n_items=2):
+        self.total_count = total_count
+        self.n_items = n_items
+        self.queries = []
+
+    def search_repositories(self, query, page, per_page):
+        self.queries.append(query)
+        items = [{"full_name": f"o/r{i}", "stargazers_count": 600, "forks_count": 0} for i in range(self.n_items)]
+        return items, self.total_count
+
+def test_oversized_shard_is_split():
+    client = FakeSearch(total_count=2500)
+    payload = {"query": "llm", "stars": [501, 700], "page": 1, "per_page": 100}
+    rows, new_tasks, truncated = handle_search(client, payload)
+    assert client.queries == ["llm stars:501..700"]
+    assert rows == [] and not truncated
+    assert [task["stars"] for _, task in new_tasks] == [[501, 600], [601, 700]]
+
+    # a single star count can't be split: crawl what search allows and report it
+    rows, new_tasks, truncated = handle_search(FakeSearch(total_count=1500), dict(payload, stars=[600, 600]))
+    assert truncated and len(rows) == 2 and new_tasks == []
+
+def test_lease_expiry_and_retry():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = make_db(tmp)
+        conn = connect(db_path)
+        enqueue_tasks(conn, RUN_ID, "search", [{"page": 1}])
+
+        task_id, _, _ = lease_task(conn, RUN_ID, "a", lease_seconds=10, now=0)
+        assert lease_task(conn, RUN_ID, "b", lease_seconds=10, now=5) is None
+
+        # a's lease expires, b takes over; a's late result is discarded
+        assert lease_task(conn, RUN_ID, "b", lease_seconds=10, now=11)[0] == task_id
+        assert not complete_task(conn, task_id, "a", RUN_ID, [("x/y", 1, 0, None, None, None, None)])
+        assert conn.execute("SELECT COUNT(*) FROM crawl_results").fetchone()[0] == 0
+
+        # b fails, the task comes back after the retry delay, third attempt is the last
+        fail_task(conn, task_id, "b", "boom", retry_in=30, now=12)
+        assert lease_task(conn, RUN_ID, "c", now=20) is None
+        assert lease_task(conn, RUN_ID, "c", now=42)[0] == task_id
+        fail_task(conn, task_id, "c", "boom again", now=43)
+        assert queue_counts(conn, RUN_ID) == {"failed": 1}
+        conn.close()
+
+def test_rate_limit_release_keeps_attempts():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = make_db(tmp)
+        conn = connect(db_path)
+        enqueue_tasks(conn, RUN_ID, "search", [{"page": 1}])
+        for _ in range(5):
+            task_id, _, _ = lease_task(conn, RUN_ID, "a", now=0)
+            fail_task(conn, task_id, "a", "rate limited", retry_in=0, count_attempt=False, now=0)
+        assert queue_counts(conn, RUN_ID) == {"pending": 1}
+        conn.close()
+
+def test_merge_refuses_failed_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = make_db(tmp)
+        plan_crawl(db_path, RUN_ID, "llm stars:>500", star_ranges=[(500, None)])
+        conn = connect(db_path)
+        conn.execute(
+            "INSERT INTO crawl_results (run_id, repo_full_name, star_count) VALUES (?, 'x/y', 600)", (RUN_ID,)
+        )
+        for attempt in range(3):
+            task_id, _, _ = lease_task(conn, RUN_ID, "a", now=attempt * 100)
+            fail_task(conn, task_id, "a", "boom", retry_in=0, now=attempt * 100)
+        assert queue_counts(conn, RUN_ID) == {"failed": 1}
+        conn.close()
+
+        assert merge_results(db_path, RUN_ID) == 0
+        assert merge_results(db_path, RUN_ID, allow_partial=True) == 1
+        assert merge_results(db_path, RUN_ID, allow_partial=True) == 0
+
+def test_merge_refuses_truncated_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = make_db(tmp)
+        plan_crawl(db_path, RUN_ID, "llm stars:>500", star_ranges=[(600, 600)])
+        conn = connect(db_path)
+        task_id, _, _ = lease_task(conn, RUN_ID, "a")
+        rows = [("x/y", 600, 0, None, None, None, "desc")]
+        assert complete_task(conn, task_id, "a", RUN_ID, rows, truncated=True)
+        conn.close()
+
+        assert merge_results(db_path, RUN_ID) == 0
+        assert merge_results(db_path, RUN_ID, allow_partial=True) == 1
+
+def test_spawned_workers_share_run_id():
+    launched = []
+    popen = crawl_coordinator.subprocess.Popen
+    crawl_coordinator.subprocess.Popen = lambda args, env: launched.append((args, env))
+    try:
+        spawn_local_workers("repos.db", "crawl-42", 2)
+    finally:
+        crawl_coordinator.subprocess.Popen = popen
+    assert [env["RUN_ID"] for _, env in launched] == ["crawl-42", "crawl-42"]
+    assert [args[-1] for args, _ in launched] == ["0", "1"]
+
+def test_token_pool_rotates_on_rate_limit():
+    now = [0]
+    pool = TokenPool(["inst-1", "inst-2"], fake_fetch_token, preferred=1, clock=lambda: now[0])
+    assert pool.acquire() == ("inst-2", "token-inst-2")
+    pool.mark_exhausted("inst-2", 100)
+    assert pool.acquire() == ("inst-1", "token-inst-1")
+    pool.mark_exhausted("inst-1", 50)
+    try:
+        pool.acquire()
+        assert False, "expected RateLimited"
+    except RateLimited as e:
+        assert e.reset_at == 50
+    now[0] = 60
+    assert pool.acquire() == ("inst-1", "token-inst-1")
+
+def test_distributed_crawl_with_worker_processes():
+    server, api_url = start_fake_github()
+    FakeGitHub.requests_by_token.clear()
+    FakeGitHub.rate_limited_tokens.add("token-inst-2")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = make_db(tmp)
+            plan_crawl(db_path, RUN_ID, "llm stars:>500", star_ranges=[(500, 999), (1000, 1699)], per_page=10,
+                       max_repos=100)
+
+            workers = [multiprocessing.Process(target=worker_process, args=(db_path, i, api_url)) for i in range(3)]
+            for w in workers:
+                w.start()
+            counts = wait_for_run(db_path, RUN_ID, poll_seconds=0.1, timeout=60)
+            for w in workers:
+                w.join(timeout=10)
+                assert w.exitcode == 0
+
+            # 2 shards x (6 pages of 10 + 1 empty page), then one enrich task for each
+            # of the top 100 repos without a description (repo-20 ... repo-116)
+            assert counts == {"done": 14 + 25}
+            assert merge_results(db_path, RUN_ID) == 100
+            assert merge_results(db_path, RUN_ID) == 0   # re-running the coordinator merges nothing
+
+            conn = sqlite3.connect(db_path)
+            names = [r[0] for r in conn.execute("SELECT repo_full_name FROM repo_stats")]
+            assert sorted(names) == sorted(r["full_name"] for r in FAKE_REPOS[20:])
+            assert conn.execute(
+                "SELECT description, created_at FROM repo_stats WHERE repo_full_name = 'owner0/repo-20'"
+            ).fetchone() == ("Generated README for owner0/repo-20", "2024-01-01 00:00:00")
+            # repos the merge drops are never sent for a README summary
+            assert conn.execute(
+                "SELECT description FROM crawl_results WHERE repo_full_name = 'owner0/repo-0'"
+            ).fetchone() == (None,)
+            conn.close()
+        assert set(FakeGitHub.requests_by_token) == {"token-inst-1", "token-inst-2", "token-inst-3"}
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_shard_query()
+    test_split_star_range()
+    test_oversized_shard_is_split()
+    test_lease_expiry_and_retry()
+    test_rate_limit_release_keeps_attempts()
+    test_merge_refuses_failed_runs()
+    test_merge_refuses_truncated_runs()
+    test_spawned_workers_share_run_id()
+    test_token_pool_rotates_on_rate_limit()
+    test_distributed_crawl_with_worker_processes()
+    print("All crawl tests passed.")
@@ -0,0 +1,55 @@
+import os
+import gzip
+import json
+import logging
+import tempfile
+
+from log_setup import setup_logging
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_json_lines_with_run_id_and_truncation():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "repo_tracker.log")
+        listener = setup_logging(run_id="run-1", log_path=log_path, max_chars=100, console=False)
+        logging.info("Processed 800 repos.")
+        logging.info("Prompt to Claude:\n" + "x" * 10_000)
+        listener.stop()
+
+        entries = read_lines(log_path)
+        assert [e["run_id"] for e in entries] == ["run-1", "run-1"]
+        assert entries[0]["msg"] == "Processed 800 repos."
+        assert entries[1]["truncated"] == 10_018 - 100
+        assert len(entries[1]["msg"]) < 150
+
+def test_sampling():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "repo_tracker.log")
+        listener = setup_logging(log_path=log_path, console=False)
+        for i in range(100):
+            logging.info(f"Using existing description for repo-{i}", extra={"sample_every": 25})
+        listener.stop()
+
+        assert [e["msg"] for e in read_lines(log_path)] == [
+            f"Using existing description for repo-{i}" for i in (0, 25, 50, 75)
+        ]
+
+def test_rotation_compresses_backups():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "repo_tracker.log")
+        listener = setup_logging(log_path=log_path, max_bytes=2000, backups=2, console=False)
+        for i in range(200):
+            logging.info(f"line {i}")
+        listener.stop()
+
+        assert sorted(os.listdir(tmp)) == ["repo_tracker.log", "repo_tracker.log.1.gz", "repo_tracker.log.2.gz"]
+        with gzip.open(log_path + ".1.gz", "rt", encoding="utf-8") as f:
+            assert json.loads(f.readline())["msg"].startswith("line ")
+
+if __name__ == "__main__":
+    test_json_lines_with_run_id_and_truncation()
+    test_sampling()
+    test_rotation_compresses_backups()
+    print("All logging tests passed.")
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from owner_index import load_big_companies, refresh_owners, classify_repos, top_by_segment, BIG_COMPANY, INDEPENDENT
+
+OWNERS = {
+    "microsoft": {"owner_type": "Organization", "followers": 90000, "is_verified": True, "domain": "opensource.microsoft.com"},
+    "meta-llama": {"owner_type": "Organization", "followers": 20000, "is_verified": True, "domain": "llama.meta.com"},
+    "fb-labs": {"owner_type": "Organization", "followers": 100, "is_verified": True, "domain": "ai.facebook.com"},
+    "fake-labs": {"owner_type": "Organization", "followers": 100, "is_verified": False, "domain": "fake.google.com"},
+    "someone": {"owner_type": "User", "followers": 50, "is_verified": False, "domain": None},
+}
+
+def make_snapshot():
+    return pd.DataFrame({
+        "repo_name": ["microsoft/autogen", "meta-llama/llama", "fb-labs/thing", "fake-labs/gemini-clone", "someone/cool-agent"],
+        "daily_pct": [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+def test_load_big_companies():
+    big = load_big_companies(os.path.join(os.path.dirname(os.path.abspath(__file__)), "bigcompanies.txt"))
+    assert {"microsoft", "huggingface", "deepseek-ai"} <= big
+
+def test_refresh_only_fetches_stale_owners():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "repos.db")
+        calls = []
+
+        def fetch(login):
+            calls.append(login)
+            return OWNERS[login]
+
+        now = datetime(2025, 1, 27)
+        assert refresh_owners(db_path, list(OWNERS), fetch, ttl_days=7, now=now) == 5
+        assert refresh_owners(db_path, list(OWNERS), fetch, ttl_days=7, now=now + timedelta(days=1)) == 0
+        assert len(calls) == 5
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE owner_index SET fetched_at = '2025-01-01 00:00:00' WHERE owner = 'someone'")
+        conn.commit()
+        conn.close()
+        assert refresh_owners(db_path, list(OWNERS), fetch, ttl_days=7, now=now + timedelta(days=1)) == 1
+        assert calls[-1] == "someone"
+
+def test_classify_repos():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "repos.db")
+        refresh_owners(db_path, list(OWNERS), OWNERS.get)
+
+        df = classify_repos(make_snapshot(), db_path, big_companies={"microsoft", "meta", "facebook", "google"})
+        assert df["segment"].tolist() == [BIG_COMPANY, BIG_COMPANY, BIG_COMPANY, INDEPENDENT, INDEPENDENT]
+        assert df["company"].fillna("").tolist() == ["microsoft", "meta", "facebook", "", ""]
+        assert df["owner_type"].tolist()[-1] == "User"
+
+        # aliases are configurable
+        df = classify_repos(make_snapshot(), db_path, big_companies={"google"}, aliases={"fake-labs": "google"})
+        assert df["segment"].tolist() == [INDEPENDENT, INDEPENDENT, INDEPENDENT, BIG_COMPANY, INDEPENDENT]
+
+        sections = dict(top_by_segment(classify_repos(make_snapshot(), db_path, big_companies={"microsoft"}), "daily_pct", n=2))
+        assert sections[INDEPENDENT]["repo_name"].tolist() == ["someone/cool-agent", "fake-labs/gemini-clone"]
+        assert sections[BIG_COMPANY]["repo_name"].tolist() == ["microsoft/autogen"]
+
+def test_classify_by_any_domain_label():
+    owners = {
+        "g-research": {"owner_type": "Organization", "followers": 100, "is_verified": True, "domain": "research.google"},
+        "nv-uk": {"owner_type": "Organization", "followers": 100, "is_verified": True, "domain": "lab.nvidia.co.uk"},
+        "co-labs": {"owner_type": "Organization", "followers": 100, "is_verified": True, "domain": "lab.example.co.uk"},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "repos.db")
+        refresh_owners(db_path, list(owners), owners.get)
+        snapshot = pd.DataFrame({"repo_name": ["g-research/model", "nv-uk/kernels", "co-labs/tool"]})
+
+        df = classify_repos(snapshot, db_path, big_companies={"google", "nvidia"})
+        assert df["segment"].tolist() == [BIG_COMPANY, BIG_COMPANY, INDEPENDENT]
+        assert df["company"].fillna("").tolist() == ["google", "nvidia", ""]
+
+if __name__ == "__main__":
+    test_load_big_companies()
+    test_refresh_only_fetches_stale_owners()
+    test_classify_repos()
+    test_classify_by_any_domain_label()
+    print("All owner index tests passed.")
@@ -0,0 +1,75 @@
+import sqlite3
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pandas as pd
+
+from repo_snapshot import RepoSnapshot, RepoSnapshotBatch
+
+def fake_repo(name, stars, created_at):
+    return SimpleNamespace(
+        full_name=name,
+        stargazers_count=stars,
+        forks_count=stars // 10,
+        created_at=created_at,
+        updated_at=datetime(2025, 1, 27, 12, 30, tzinfo=timezone.utc),
+    )
+
+def test_snapshot_from_github():
+    snapshot = RepoSnapshot.from_github(
+        fake_repo("hot-repo/viral", 1300, datetime(2024, 1, 1)),  # naive datetimes are UTC
+        "Viral repo",
+        polled_at=datetime(2025, 1, 27, tzinfo=timezone.utc).timestamp(),
+    )
+    assert not hasattr(snapshot, "__dict__")
+    assert snapshot.db_row() == (
+        "hot-repo/viral", 1300, 130,
+        "2025-01-27 00:00:00", "2024-01-01 00:00:00", "2025-01-27 12:30:00",
+        "Viral repo",
+    )
+
+def test_batch_to_frame_and_db_rows():
+    batch = RepoSnapshotBatch()
+    batch.append(RepoSnapshot.from_github(fake_repo("hot-repo/viral", 1300, datetime(2024, 1, 1)), "Viral", 0),
+                 100, 8.33, 300, 30.0)
+    batch.append(RepoSnapshot.from_github(fake_repo("slow/repo", 10110, datetime(2020, 1, 1)), None, 0))
+
+    df = batch.to_frame()
+    assert list(df.columns) == ["repo_name", "stars", "daily_diff", "daily_pct", "weekly_diff",
+                                "weekly_pct", "created_at", "updated_at", "description"]
+    assert df["stars"].tolist() == [1300, 10110]
+    assert df["weekly_pct"].tolist() == [30.0, 0.0]
+    assert df["created_at"].iloc[1] == pd.Timestamp("2020-01-01")
+    assert df.nlargest(1, "daily_pct")["repo_name"].iloc[0] == "hot-repo/viral"
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE repo_stats (repo_full_name, star_count, forks_count, timestamp, created_at, updated_at, description)")
+    conn.executemany("INSERT INTO repo_stats VALUES (?, ?, ?, ?, ?, ?, ?)", batch.db_rows())
+    assert conn.execute("SELECT repo_full_name, star_count, timestamp FROM repo_stats").fetchall() == [
+        ("hot-repo/viral", 1300, "1970-01-01 00:00:00"),
+        ("slow/repo", 10110, "1970-01-01 00:00:00"),
+    ]
+
+def test_missing_timestamps_stay_missing():
+    repo = fake_repo("no/dates", 600, None)
+    repo.updated_at = None
+    snapshot = RepoSnapshot.from_github(repo, None, polled_at=0)
+    assert snapshot.db_row()[4:6] == (None, None)
+
+    batch = RepoSnapshotBatch()
+    batch.append(snapshot)
+    batch.append(RepoSnapshot.from_github(fake_repo("with/dates", 700, datetime(2024, 1, 1)), None, 0))
+    df = batch.to_frame()
+    assert df["created_at"].isna().tolist() == [True, False]
+    assert df["updated_at"].isna().tolist() == [True, False]
+    assert [row[4] for row in batch.db_rows()] == [None, "2024-01-01 00:00:00"]
+
+def test_empty_batch():
+    assert RepoSnapshotBatch().to_frame().empty
+
+if __name__ == "__main__":
+    test_snapshot_from_github()
+    test_batch_to_frame_and_db_rows()
+    test_missing_timestamps_stay_missing()
+    test_empty_batch()
+    print("All RepoSnapshot tests passed.")
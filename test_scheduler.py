@@ -0,0 +1,153 @@
+from poll_scheduler import PollScheduler, WriteBuffer
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+def test_hot_repos_polled_more_often():
+    clock = FakeClock()
+    scheduler = PollScheduler(clock=clock, budget_per_hour=1000)
+    scheduler.add_repo("hot-repo/viral", 1000, velocity=100)
+    scheduler.add_repo("dormant/giant", 50000, velocity=0)
+
+    assert scheduler.next_due("hot-repo/viral") == scheduler.min_interval
+    assert scheduler.next_due("dormant/giant") == scheduler.max_interval
+
+    clock.advance(scheduler.min_interval)
+    assert scheduler.pop_due() == ["hot-repo/viral"]
+
+def test_velocity_updates_interval():
+    clock = FakeClock()
+    scheduler = PollScheduler(clock=clock, smoothing=1.0)
+    scheduler.add_repo("steady/growth", 5000)
+
+    clock.advance(3600)
+    interval = scheduler.record_poll("steady/growth", 5010)  # 10 stars/hour
+    assert scheduler.velocity("steady/growth") == 10
+    assert interval == scheduler.stars_per_poll / 10 * 3600
+
+def test_budget_stretches_intervals():
+    clock = FakeClock()
+    scheduler = PollScheduler(clock=clock, budget_per_hour=4)
+    for i in range(8):
+        scheduler.add_repo(f"hot/repo-{i}", 1000, velocity=1000)  # each wants 4 polls/hour
+
+    assert scheduler.budget_scale() == 8
+    for i in range(8):
+        assert scheduler.next_due(f"hot/repo-{i}") == scheduler.min_interval * 8
+
+def test_budget_scale_is_shared_by_dormant_and_hot_repos():
+    clock = FakeClock()
+    scheduler = PollScheduler(clock=clock, budget_per_hour=2)
+    # seeded in stars-desc order: the dormant giant comes first
+    scheduler.add_repo("dormant/giant", 50000, velocity=0)
+    for i in range(3):
+        scheduler.add_repo(f"hot/repo-{i}", 1000, velocity=1000)
+
+    scale = scheduler.budget_scale()
+    assert scale > 1
+    assert scheduler.next_due("dormant/giant") == scheduler.max_interval * scale
+    for i in range(3):
+        assert scheduler.next_due(f"hot/repo-{i}") == scheduler.min_interval * scale
+
+    # dropping a repo shrinks the scale for everyone still queued
+    scheduler.remove_repo("hot/repo-2")
+    scale = scheduler.budget_scale()
+    assert scheduler.next_due("dormant/giant") == scheduler.max_interval * scale
+    assert scheduler.next_due("hot/repo-0") == scheduler.min_interval * scale
+
+def test_retain_drops_repos_that_left_the_search():
+    clock = FakeClock()
+    scheduler = PollScheduler(clock=clock, budget_per_hour=4)
+    for i in range(8):
+        scheduler.add_repo(f"hot/repo-{i}", 1000, velocity=1000)
+    assert scheduler.budget_scale() == 8
+
+    removed = scheduler.retain([f"hot/repo-{i}" for i in range(4)])
+    assert sorted(removed) == [f"hot/repo-{i}" for i in range(4, 8)]
+    assert len(scheduler) == 4 and "hot/repo-7" not in scheduler
+    assert scheduler.budget_scale() == 4
+    assert scheduler.next_due("hot/repo-0") == scheduler.min_interval * 4
+
+    clock.advance(scheduler.min_interval * 4)
+    polled = []
+    for _ in range(10):
+        polled += scheduler.pop_due()
+        clock.advance(3600)
+    assert sorted(polled) == [f"hot/repo-{i}" for i in range(4)]
+
+def test_token_bucket_limits_pops():
+    clock = FakeClock()
+    scheduler = PollScheduler(clock=clock, budget_per_hour=60)  # one poll per minute, burst of 1
+    for i in range(3):
+        scheduler.add_repo(f"repo/{i}", 100, polled_at=-scheduler.max_interval)
+
+    assert len(scheduler.pop_due()) == 1
+    assert scheduler.pop_due() == []
+    assert scheduler.seconds_until_next() == 60
+    clock.advance(60)
+    assert len(scheduler.pop_due()) == 1
+
+def test_failed_poll_is_retried():
+    clock = FakeClock()
+    scheduler = PollScheduler(clock=clock)
+    scheduler.add_repo("flaky/repo", 100, polled_at=-scheduler.max_interval)
+    assert scheduler.pop_due() == ["flaky/repo"]
+    assert scheduler.seconds_until_next() is None
+
+    scheduler.record_failure("flaky/repo")
+    clock.advance(scheduler.min_interval)
+    assert scheduler.pop_due() == ["flaky/repo"]
+
+def test_write_buffer_batches():
+    clock = FakeClock()
+    batches = []
+    buffer = WriteBuffer(batches.append, batch_size=3, max_age=60, clock=clock)
+
+    buffer.add(1)
+    buffer.add(2)
+    assert batches == []
+    buffer.add(3)
+    assert batches == [[1, 2, 3]]
+
+    buffer.add(4)
+    clock.advance(60)
+    assert buffer.maybe_flush() == 1
+    assert batches == [[1, 2, 3], [4]]
+
+def test_write_buffer_keeps_rows_when_flush_fails():
+    clock = FakeClock()
+    batches = []
+    failures = [RuntimeError("database is locked")]
+
+    def flush_fn(rows):
+        if failures:
+            raise failures.pop()
+        batches.append(rows)
+
+    buffer = WriteBuffer(flush_fn, batch_size=2, max_age=60, clock=clock)
+    buffer.add(1)
+    assert buffer.add(2) == 0
+    assert len(buffer) == 2 and batches == []
+
+    # retried on the next tick
+    assert buffer.maybe_flush() == 2
+    assert len(buffer) == 0 and batches == [[1, 2]]
+
+if __name__ == "__main__":
+    test_hot_repos_polled_more_often()
+    test_velocity_updates_interval()
+    test_budget_stretches_intervals()
+    test_budget_scale_is_shared_by_dormant_and_hot_repos()
+    test_retain_drops_repos_that_left_the_search()
+    test_token_bucket_limits_pops()
+    test_failed_poll_is_retried()
+    test_write_buffer_batches()
+    test_write_buffer_keeps_rows_when_flush_fails()
+    print("All scheduler tests passed.")
@@ -0,0 +1,105 @@
+import os
+import time
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from snapshot_archive import write_snapshot, read_snapshots, import_csv_logs
+
+def make_snapshot(stars_offset=0):
+    return pd.DataFrame({
+        "repo_name": ["hot-repo/viral", "steady/growth", "slow/repo"],
+        "stars": [1300 + stars_offset, 5300 + stars_offset, 10110 + stars_offset],
+        "daily_diff": [100, 50, 10],
+        "daily_pct": [8.33, 0.95, 0.1],
+        "weekly_diff": [300, 300, 110],
+        "weekly_pct": [30.0, 6.0, 1.1],
+        "created_at": pd.to_datetime(["2024-01-01", "2023-06-01", "2020-01-01"], utc=True),
+        "updated_at": pd.to_datetime(["2025-01-27", "2025-01-27", "2025-01-26"], utc=True),
+        "description": ["Viral repo", "Steady repo", None],
+    })
+
+def test_write_and_read_range():
+    with tempfile.TemporaryDirectory() as root:
+        write_snapshot(make_snapshot(), "daily", datetime(2025, 1, 26, 9), root=root)
+        write_snapshot(make_snapshot(100), "daily", datetime(2025, 1, 27, 9), root=root)
+        write_snapshot(make_snapshot(200), "weekly", datetime(2025, 1, 28, 9), root=root)
+
+        assert sorted(os.listdir(root)) == ["date=2025-01-26", "date=2025-01-27", "date=2025-01-28"]
+
+        df = read_snapshots("2025-01-27", "2025-01-28", columns=["run_kind", "repo_name", "stars"], root=root)
+        assert list(df.columns) == ["run_kind", "repo_name", "stars"]
+        assert len(df) == 6
+        assert df["stars"].min() == 1400
+
+        daily = read_snapshots(
+            columns=["repo_name", "stars"],
+            filter=(ds.field("run_kind") == "daily") & (ds.field("stars") > 5000),
+            root=root,
+        )
+        assert sorted(daily["repo_name"].astype(str)) == ["slow/repo", "slow/repo", "steady/growth", "steady/growth"]
+
+def test_read_datetime_range_filters_runs_within_a_day():
+    with tempfile.TemporaryDirectory() as root:
+        write_snapshot(make_snapshot(), "daily", datetime(2025, 1, 27, 6), root=root)
+        write_snapshot(make_snapshot(100), "daily", datetime(2025, 1, 27, 18), root=root)
+        write_snapshot(make_snapshot(200), "daily", datetime(2025, 1, 28, 6), root=root)
+
+        df = read_snapshots(datetime(2025, 1, 27, 12), datetime(2025, 1, 28, 0, 30), columns=["stars"], root=root)
+        assert sorted(df["stars"]) == [1400, 5400, 10210]
+        assert len(read_snapshots("2025-01-27", "2025-01-27", root=root)) == 6
+
+def test_rewriting_a_run_replaces_it():
+    with tempfile.TemporaryDirectory() as root:
+        run_ts = datetime(2025, 1, 27, 9)
+        write_snapshot(make_snapshot(), "daily", run_ts, root=root)
+        write_snapshot(make_snapshot(), "daily", run_ts, root=root)
+        assert len(read_snapshots(root=root)) == 3
+
+def test_import_csv_logs():
+    with tempfile.TemporaryDirectory() as tmp:
+        logs_root = os.path.join(tmp, "logs")
+        archive_root = os.path.join(logs_root, "archive")
+        for run_kind, folder in [("daily", "2025-01-26_09-00-00"), ("weekly", "2025-01-27_09-00-00")]:
+            run_dir = os.path.join(logs_root, run_kind, folder)
+            os.makedirs(run_dir)
+            make_snapshot().to_csv(os.path.join(run_dir, f"{run_kind}_repos_{folder}.csv"), index=False)
+
+        assert import_csv_logs(logs_root, root=archive_root) == 2
+        df = read_snapshots(root=archive_root)
+        assert len(df) == 6
+        assert set(df["run_kind"].astype(str)) == {"daily", "weekly"}
+        assert df["created_at"].min() == pd.Timestamp("2020-01-01")
+
+def test_import_csv_logs_converts_local_folder_time_to_utc():
+    old_tz = os.environ.get("TZ")
+    os.environ["TZ"] = "America/Los_Angeles"
+    time.tzset()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            logs_root = os.path.join(tmp, "logs")
+            archive_root = os.path.join(logs_root, "archive")
+            run_dir = os.path.join(logs_root, "daily", "2025-01-26_20-00-00")  # 04:00 UTC the next day
+            os.makedirs(run_dir)
+            make_snapshot().to_csv(os.path.join(run_dir, "daily_repos_2025-01-26_20-00-00.csv"), index=False)
+
+            assert import_csv_logs(logs_root, root=archive_root) == 1
+            assert os.listdir(archive_root) == ["date=2025-01-27"]
+            df = read_snapshots(root=archive_root)
+            assert set(df["run_ts"]) == {pd.Timestamp("2025-01-27 04:00:00")}
+    finally:
+        if old_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = old_tz
+        time.tzset()
+
+if __name__ == "__main__":
+    test_write_and_read_range()
+    test_rewriting_a_run_replaces_it()
+    test_read_datetime_range_filters_runs_within_a_day()
+    test_import_csv_logs()
+    test_import_csv_logs_converts_local_folder_time_to_utc()
+    print("All snapshot archive tests passed.")
@@ -5,7 +5,10 @@ from datetime import datetime
 import pandas as pd
 import logging
 
-from core_monitor import run_repo_tracking, anthropic_client, post_to_basecamp
+from core_monitor import run_repo_tracking, anthropic_client, post_to_basecamp, github_client, DB_PATH
+from categorize import categorize_repos, top_by_category
+from owner_index import refresh_owners, classify_repos, fetch_owner_metadata, repo_owners, top_by_segment
+from snapshot_archive import write_snapshot
 
 def generate_weekly_analysis(df):
     """
@@ -28,10 +31,14 @@ Focus on weekly changes only."""
         logging.error(f"Error generating weekly analysis: {e}")
         return "Error generating weekly analysis."
 
-def generate_weekly_report(df, analysis_text=""):
+def generate_weekly_report(df, analysis_text="", segment=None):
     """
     Build a Markdown report focusing on top weekly growth.
+    Pass segment="independent" or "big company" to only report on those repos.
     """
+    if segment and 'segment' in df.columns:
+        df = df[df['segment'] == segment].copy()
+
     if 'created_at' in df.columns:
         df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce')
 
@@ -54,11 +61,29 @@ Generated on {timestamp}
 - ⭐ Stars: {repo['stars']:,} 
 - 📈 1-Week Growth: {repo['weekly_diff']:,} stars ({repo['weekly_pct']:.2f}%)
 - 🎂 Created: {repo_created}
+- 🏷️ Category: {repo.get('category', 'N/A')}
+- 🏢 Owner: {repo['company'] if isinstance(repo.get('company'), str) else repo.get('segment', 'N/A')}
 - 🔍 Description: {repo['description']}
 - 🔗 [Repo Link](https://github.com/{repo['repo_name']})
 
 """
 
+    if 'segment' in df.columns and not segment:
+        for seg, top_repos in top_by_segment(df, 'weekly_pct'):
+            report += f"## Top 5 Weekly Growth: {seg.title()}\n"
+            for _, repo in top_repos.iterrows():
+                report += (f"- [{repo['repo_name']}](https://github.com/{repo['repo_name']}): "
+                           f"{repo['weekly_diff']:+,} stars ({repo['weekly_pct']:.2f}%)\n")
+            report += "\n"
+
+    if 'category' in df.columns:
+        report += "## Weekly Growth by Category\n"
+        for category, top_repos in top_by_category(df, 'weekly_pct'):
+            report += f"\n### {category}\n"
+            for _, repo in top_repos.iterrows():
+                report += (f"- [{repo['repo_name']}](https://github.com/{repo['repo_name']}): "
+                           f"{repo['weekly_diff']:+,} stars ({repo['weekly_pct']:.2f}%)\n")
+
     return report
 
 if __name__ == "__main__":
@@ -69,6 +94,14 @@ if __name__ == "__main__":
             logging.error("No data collected, exiting.")
             exit(1)
 
+        # 1b) Tag each repo with a category (cached locally, no API calls)
+        df = categorize_repos(df, DB_PATH)
+
+        # 1c) Split big-company vs independent repos (owner metadata is cached; only new or stale owners are fetched)
+        refresh_owners(DB_PATH, repo_owners(df["repo_name"]).unique(),
+                       lambda login: fetch_owner_metadata(github_client, login))
+        df = classify_repos(df, DB_PATH)
+
         # 2) Weekly analysis
         analysis = generate_weekly_analysis(df.nlargest(5, 'weekly_pct'))
 
@@ -77,6 +110,7 @@ if __name__ == "__main__":
         
         # 4) Create a folder in logs/weekly/<timestamp>
         timestamp_full = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        run_ts = datetime.utcnow()  # archive partitions are UTC days, like repo_stats
         folder_name = os.path.join("logs", "weekly", timestamp_full)
         os.makedirs(folder_name, exist_ok=True)
         
@@ -85,9 +119,8 @@ if __name__ == "__main__":
         with open(md_path, "w") as f:
             f.write(weekly_md)
         
-        # 6) (Optional) also store a CSV
-        csv_path = os.path.join(folder_name, f"weekly_repos_{timestamp_full}.csv")
-        df.to_csv(csv_path, index=False)
+        # 6) Append the snapshot to the Parquet archive
+        write_snapshot(df, "weekly", run_ts)
 
         logging.info(f"Weekly report created: {md_path}")
 